@@ -65,6 +65,13 @@ DEMO_PAGES: tuple[DemoPage, ...] = (
         function=demo_apps.stqdm_multi_bars_in_columns,
         kwargs={"iterations": 10, "task_duration": 0.01},
     ),
+    DemoPage(
+        section="Basics",
+        title="Group of bars",
+        description="Render 20 concurrent bars as a single element with `stqdm_group`.",
+        function=demo_apps.stqdm_group_of_bars,
+        kwargs={"bars": 20, "iterations": 10, "task_duration": 0.01},
+    ),
     DemoPage(
         section="Basics",
         title="Nested progress bars",
@@ -131,9 +138,9 @@ DEMO_PAGES: tuple[DemoPage, ...] = (
     DemoPage(
         section="Configuration",
         title="Patch tqdm.auto",
-        description="Patch `tqdm.auto.tqdm` so future callers use STqdm.",
+        description="Patch tqdm with `patch_tqdm` so third-party bars render as one STqdm summary.",
         function=demo_apps.stqdm_patch_tqdm,
-        kwargs={},
+        kwargs={"bars": 50, "iterations": 10, "task_duration": 0.001},
     ),
     DemoPage(
         section="Patterns",
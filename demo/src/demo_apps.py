@@ -63,17 +63,40 @@ def stqdm_multi_bars_in_columns(iterations: int = 10, task_duration: float = 0.0
                     break
 
 
+def stqdm_group_of_bars(bars: int = 20, iterations: int = 10, task_duration: float = 0.01) -> None:
+    """Render many concurrent bars as a single element with stqdm_group."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from stqdm.group import stqdm_group
+
+    from demo.src import demo_apps
+
+    def run_job(progress_bar) -> None:
+        # Workers have no ScriptRunContext, the group renders their updates from its own renderer thread
+        for _ in progress_bar:
+            demo_apps.long_running_task(task_duration)
+
+    with stqdm_group() as group, ThreadPoolExecutor(max_workers=bars) as executor:
+        progress_bars = [group.bar(range(iterations), desc=f"Job {index}") for index in range(bars)]
+        list(executor.map(run_job, progress_bars))
+
+
 def stqdm_in_main_nested(outer_iterations: int = 3, inner_iterations: int = 4, task_duration: float = 0.01) -> None:
-    """Render nested progress bars and clear each inner bar after it finishes."""
+    """Render nested progress bars and clear each inner bar after it finishes.
+
+    The inner bar is reset at each outer iteration, so that it reuses the same Streamlit elements.
+    """
     from stqdm import stqdm
 
     from demo.src import demo_apps
 
-    for _ in stqdm(range(outer_iterations)):
-        progress_bar = stqdm(range(inner_iterations))
-        for _ in progress_bar:
+    outer_bar = stqdm(range(outer_iterations))
+    inner_bar = stqdm(total=inner_iterations)
+    for _ in outer_bar:
+        inner_bar.reset(iterable=range(inner_iterations))
+        for _ in inner_bar:
             demo_apps.long_running_task(task_duration)
-        progress_bar.st_clear()
+        inner_bar.st_clear()
 
 
 def stqdm_no_total_no_length(iterations: int = 10, task_duration: float = 0.01) -> None:
@@ -325,14 +348,18 @@ def st_lock(task_duration: float = 0.01) -> None:
     st.write("end lock")
 
 
-def stqdm_patch_tqdm() -> None:
-    """Patch tqdm.auto.tqdm so future tqdm.auto users render through STqdm."""
+def stqdm_patch_tqdm(bars: int = 50, iterations: int = 10, task_duration: float = 0.001) -> None:
+    """Patch tqdm so that the bars of third-party code render as a single STqdm summary."""
     import streamlit as st
     from tqdm import auto as module_containing_tqdm_to_patch
 
-    from stqdm import stqdm
+    from stqdm.patch import patch_tqdm, patched_tqdm
 
-    if module_containing_tqdm_to_patch.tqdm is not stqdm:
-        module_containing_tqdm_to_patch.tqdm = stqdm
+    from demo.src import demo_apps
 
-    st.write("tqdm.auto.tqdm is patched:", module_containing_tqdm_to_patch.tqdm is stqdm)
+    with patch_tqdm(desc="Third-party bars"):
+        st.write("tqdm.auto.tqdm is patched:", module_containing_tqdm_to_patch.tqdm is patched_tqdm)
+        # What a library creating many short bars would do
+        for _ in range(bars):
+            for _ in module_containing_tqdm_to_patch.tqdm(range(iterations)):
+                demo_apps.long_running_task(task_duration)
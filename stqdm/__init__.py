@@ -1,4 +1,4 @@
-from importlib.metadata import PackageNotFoundError, version
+from typing import Any
 
 from stqdm.asyncio import astqdm, stqdm_asyncio
 from stqdm.auto import tqdm, trange
@@ -6,7 +6,14 @@ from stqdm.stqdm import stqdm
 
 __all__ = ["astqdm", "stqdm", "stqdm_asyncio", "tqdm", "trange"]
 
-try:
-    __version__ = version("stqdm")
-except PackageNotFoundError:
-    __version__ = "0+unknown"
+
+def __getattr__(name: str) -> Any:
+    # importlib.metadata is slow to import, __version__ is resolved on first access
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version  # pylint: disable=import-outside-toplevel
+
+        try:
+            return version("stqdm")
+        except PackageNotFoundError:
+            return "0+unknown"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
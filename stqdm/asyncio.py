@@ -1,38 +1,83 @@
 from __future__ import annotations
 
 # pylint: disable=invalid-name
-from collections.abc import AsyncIterable, Iterable, Iterator
-from typing import Any, Optional, cast
+import asyncio
+import inspect
+import time
+from collections import deque
+from collections.abc import AsyncIterable, Awaitable, Generator, Iterable, Iterator
+from concurrent.futures import Executor
+from operator import itemgetter
+from typing import Any, Optional, TypeVar, cast
 
 from typing_extensions import Unpack
 
-from stqdm.stqdm import stqdm
+from stqdm.stqdm import FRONTEND_RENDER_MODES, stqdm
 from stqdm.types import STQDMArgs
 
 __all__ = ["astqdm", "stqdm_asyncio", "tarange", "tqdm", "trange"]
 
+T = TypeVar("T")
+
+# Default frontend_mininterval of as_completed and gather, so that thousands of completions do not render one by one
+DEFAULT_TASKS_FRONTEND_MININTERVAL = 0.1
+
 
 class stqdm_asyncio(stqdm):
-    """Async-aware STqdm entrypoint with dual-protocol iterable handling."""
+    """Async-aware STqdm entrypoint with dual-protocol iterable handling.
+
+    On top of stqdm's render modes, frontend_render_mode="loop" schedules frontend updates on the running
+    event loop instead of rendering inside display(): at most one update is pending per bar, it runs once
+    the current task yields and no sooner than frontend_mininterval after the previous render.
+    """
+
+    frontend_render_modes = (*FRONTEND_RENDER_MODES, "loop")
 
     def __init__(
         self,
         iterable: Optional[Iterable[Any] | AsyncIterable[Any]] = None,
+        *,
+        readahead: int = 0,
+        executor: Optional[Executor] = None,
+        batch_size: Optional[int] = None,
         **kwargs: Unpack[STQDMArgs],
     ) -> None:
+        """Initializes the bar, see stqdm.
+
+        Args:
+            iterable (Optional[Iterable | AsyncIterable]): The iterable to wrap with the progress bar.
+            readahead (int): With `async for` on a synchronous iterable, pull its items in an executor,
+                up to readahead items ahead of the consumer, so that a blocking source does not block the event loop.
+                0 (default) calls next() directly on the event loop.
+            executor (Optional[Executor]): Executor used with readahead, the loop's default executor if None.
+                Use a single thread executor for sources bound to a thread, like sqlite cursors.
+                Providing an executor sets readahead to 1 if it is not set.
+            batch_size (Optional[int]): With `async for`, fetch items batch_size at a time and update the counter
+                once per batch instead of once per item. Sources with an async fetchmany(size) method, like async
+                DB-API cursors, are fetched with it, one page per batch.
+            **kwargs (Unpack[STQDMArgs]): Arguments of stqdm.
+        """
+        # tqdm displays during __init__
+        self._frontend_render_handle: Optional[asyncio.TimerHandle | asyncio.Handle] = None
+        self._executor_reader: Optional[_ExecutorReader] = None
+        self._readahead = readahead
+        self._executor = executor
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be >= 1.")
+        self._batch_size = batch_size
+        self._batch: deque[Any] = deque()
+        # Items of the current batch already handed to the consumer, counted when the next batch is fetched
+        self._batch_consumed = 0
+        # With record_latency, the time.perf_counter() of the last item returned by __anext__
+        self._latency_body_start: Optional[float] = None
+        fetchmany = getattr(iterable, "fetchmany", None)
+        self._batch_fetchmany = fetchmany if inspect.iscoroutinefunction(fetchmany) else None
         async_iterator = self._get_async_iterator(iterable)
         if async_iterator is None:
             sync_iterable = cast(Iterable[Any] | None, iterable)
             super().__init__(iterable=sync_iterable, **kwargs)
-            self.iterable_awaitable = False
-            if iterable is not None:
-                if hasattr(iterable, "__next__"):
-                    sync_iterator = cast(Iterator[Any], iterable)
-                    self.iterable_iterator = sync_iterator
-                    self.iterable_next = sync_iterator.__next__
-                else:
-                    self.iterable_iterator = iter(cast(Iterable[Any], iterable))
-                    self.iterable_next = self.iterable_iterator.__next__
+            # stqdm may have wrapped the iterable, with prefetch for instance
+            self._bind_sync_iterable(self.iterable)
             return
 
         merged_kwargs = cast(STQDMArgs, dict(kwargs))
@@ -41,10 +86,227 @@ class stqdm_asyncio(stqdm):
             if inferred_total is not None:
                 merged_kwargs["total"] = inferred_total
         super().__init__(iterable=None, **merged_kwargs)
+        self._bind_async_iterator(async_iterator)
+
+    def _bind_sync_iterable(self, iterable: Optional[Iterable[Any]]) -> None:
+        self.iterable_awaitable = False
+        if iterable is None:
+            return
+        if self._readahead > 0 or self._executor is not None:
+            self._executor_reader = _ExecutorReader(iter(iterable), max(self._readahead, 1), self._executor)
+            self.iterable_awaitable = True
+            self.iterable_next = self._executor_reader.next
+        elif hasattr(iterable, "__next__"):
+            sync_iterator = cast(Iterator[Any], iterable)
+            self.iterable_iterator = sync_iterator
+            self.iterable_next = sync_iterator.__next__
+        else:
+            self.iterable_iterator = iter(iterable)
+            self.iterable_next = self.iterable_iterator.__next__
+
+    def _bind_async_iterator(self, async_iterator: Any) -> None:
         self.iterable_awaitable = True
         self.iterable_iterator = async_iterator
         self.iterable_next = async_iterator.__anext__
 
+    def reset(  # type: ignore[override]
+        self, total: Optional[float] = None, iterable: Optional[Iterable[Any] | AsyncIterable[Any]] = None
+    ) -> None:
+        """Resets the bar to 0 for repeated use, see stqdm.reset. iterable can be synchronous or asynchronous."""
+        self._batch.clear()
+        self._batch_consumed = 0
+        self._latency_body_start = None
+        if iterable is not None:
+            fetchmany = getattr(iterable, "fetchmany", None)
+            self._batch_fetchmany = fetchmany if inspect.iscoroutinefunction(fetchmany) else None
+        async_iterator = self._get_async_iterator(iterable)
+        if async_iterator is None:
+            super().reset(total, cast(Optional[Iterable[Any]], iterable))
+            if iterable is not None:
+                if self._executor_reader is not None:
+                    self._executor_reader.cancel()
+                self._bind_sync_iterable(self.iterable)
+            return
+        super().reset(self._safe_len(iterable) if total is None else total)
+        self.iterable = None
+        self._bind_async_iterator(async_iterator)
+
+    async def __anext__(self) -> Any:
+        if self.latency is None:
+            return await self._anext()
+        # As with stqdm's for loops, only the loop body is timed, between returning an item and being asked for the next
+        if self._latency_body_start is not None:
+            self.latency.record(time.perf_counter() - self._latency_body_start)
+            self._latency_body_start = None
+        obj = await self._anext()
+        self._latency_body_start = time.perf_counter()
+        return obj
+
+    async def _anext(self) -> Any:
+        if self._batch_size is None:
+            return await super().__anext__()
+        if not self._batch:
+            if self._batch_consumed:
+                self.update(self._batch_consumed)
+                self._batch_consumed = 0
+            try:
+                self._batch.extend(await self._fetch_batch(self._batch_size))
+            except BaseException:
+                self.close()
+                raise
+            if not self._batch:
+                self.close()
+                raise StopAsyncIteration
+        self._batch_consumed += 1
+        return self._batch.popleft()
+
+    async def _fetch_batch(self, size: int) -> list[Any]:
+        if self._batch_fetchmany is not None:
+            return list(await self._batch_fetchmany(size))
+        batch = []
+        try:
+            for _ in range(size):
+                batch.append(await self.iterable_next() if self.iterable_awaitable else self.iterable_next())
+        except (StopIteration, StopAsyncIteration):
+            pass
+        return batch
+
+    def _request_frontend_render(self) -> None:
+        if self._frontend_render_mode != "loop":
+            super()._request_frontend_render()
+            return
+        if self._frontend_render_handle is not None:
+            # An update is already scheduled, it will render the latest state
+            self._frontend_pending = True
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Used outside of the event loop: render as in sync mode
+            super()._request_frontend_render()
+            return
+        self._frontend_pending = True
+        delay = self._frontend_last_render_t + self._frontend_mininterval - self._time()
+        if delay > 0:
+            self._frontend_render_handle = loop.call_later(delay, self._run_scheduled_frontend_render)
+        else:
+            self._frontend_render_handle = loop.call_soon(self._run_scheduled_frontend_render)
+
+    def _run_scheduled_frontend_render(self) -> None:
+        self._frontend_render_handle = None
+        self._flush_frontend()
+
+    def close(self) -> None:
+        """Close the progress bar, a scheduled frontend update is replaced by a final render."""
+        render_handle = getattr(self, "_frontend_render_handle", None)
+        if render_handle is not None:
+            render_handle.cancel()
+            self._frontend_render_handle = None
+        executor_reader = getattr(self, "_executor_reader", None)
+        if executor_reader is not None:
+            executor_reader.cancel()
+        if getattr(self, "_batch_consumed", 0) and not self.disable:
+            self.update(self._batch_consumed)
+            self._batch_consumed = 0
+        super().close()
+
+    async def aclose(self) -> None:
+        """Awaitable version of close(), flushes the final state of the bar."""
+        self.close()
+
+    async def __aenter__(self) -> "stqdm_asyncio":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.aclose()
+
+    @classmethod
+    def as_completed(  # type: ignore[override]
+        cls,
+        fs: Iterable[Awaitable[T]],
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        timeout: Optional[float] = None,
+        total: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        **tqdm_kwargs: Any,
+    ) -> Generator[Awaitable[T], None, None]:
+        """Wrapper for `asyncio.as_completed`, the bar advances as awaitables finish.
+
+        Args:
+            fs (Iterable[Awaitable]): The awaitables to run. Awaitables already scheduled (tasks) are not bounded.
+            loop (Optional[asyncio.AbstractEventLoop]): Unused, kept for compatibility with tqdm.
+            timeout (Optional[float]): See `asyncio.as_completed`.
+            total (Optional[float]): Defaults to the number of awaitables.
+            max_concurrency (Optional[int]): Maximum number of awaitables running at the same time.
+            **tqdm_kwargs: Arguments of the progress bar. frontend_mininterval defaults to DEFAULT_TASKS_FRONTEND_MININTERVAL.
+
+        Raises:
+            ValueError: If max_concurrency is lower than 1.
+        """
+        fs = list(fs)
+        if max_concurrency is not None:
+            if max_concurrency < 1:
+                raise ValueError("max_concurrency must be >= 1.")
+            semaphore = asyncio.Semaphore(max_concurrency)
+            fs = [cls._run_with_semaphore(semaphore, f) for f in fs]
+        if "frontend_mininterval" not in cls.combine_default_and_provided_kwargs(cast(STQDMArgs, tqdm_kwargs)):
+            tqdm_kwargs["frontend_mininterval"] = DEFAULT_TASKS_FRONTEND_MININTERVAL
+        # tqdm's stubs type loop as bool and total as int
+        yield from super().as_completed(fs, loop=loop, timeout=timeout, total=total, **tqdm_kwargs)  # type: ignore[arg-type]
+
+    @classmethod
+    async def gather(  # type: ignore[override]
+        cls,
+        *fs: Awaitable[T],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        timeout: Optional[float] = None,
+        total: Optional[float] = None,
+        return_exceptions: bool = False,
+        max_concurrency: Optional[int] = None,
+        ordered: bool = True,
+        **tqdm_kwargs: Any,
+    ) -> list[T | BaseException]:
+        """Wrapper for `asyncio.gather`, the bar advances as awaitables finish.
+
+        Args:
+            *fs (Awaitable): The awaitables to run.
+            loop (Optional[asyncio.AbstractEventLoop]): Unused, kept for compatibility with tqdm.
+            timeout (Optional[float]): See `asyncio.as_completed`.
+            total (Optional[float]): Defaults to the number of awaitables.
+            return_exceptions (bool): See `asyncio.gather`.
+            max_concurrency (Optional[int]): Maximum number of awaitables running at the same time.
+            ordered (bool): If True, results are in the order of fs, otherwise in completion order.
+            **tqdm_kwargs: Arguments of the progress bar, see `as_completed`.
+
+        Returns:
+            list: The results of the awaitables.
+        """
+
+        async def wrap_awaitable(index: int, f: Awaitable[T]) -> tuple[int, T | BaseException]:
+            try:
+                return index, await f
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                if return_exceptions:
+                    return index, error
+                raise
+
+        indexed_fs = [wrap_awaitable(index, f) for index, f in enumerate(fs)]
+        results = [
+            await f
+            for f in cls.as_completed(
+                indexed_fs, loop=loop, timeout=timeout, total=total, max_concurrency=max_concurrency, **tqdm_kwargs
+            )
+        ]
+        if ordered:
+            results.sort(key=itemgetter(0))
+        return [result for _, result in results]
+
+    @staticmethod
+    async def _run_with_semaphore(semaphore: asyncio.Semaphore, f: Awaitable[T]) -> T:
+        async with semaphore:
+            return await f
+
     @staticmethod
     def _get_async_iterator(iterable: Optional[Iterable[Any] | AsyncIterable[Any]]) -> Any | None:
         if iterable is None or hasattr(iterable, "__iter__"):
@@ -65,6 +327,52 @@ class stqdm_asyncio(stqdm):
             return None
 
 
+class _ExecutorReader:
+    """Pulls the items of a blocking iterator in an executor, a bounded queue keeps the consumer readahead items ahead.
+
+    A single producer task calls next() in the executor, one call at a time, so the iterator is never used concurrently.
+    """
+
+    def __init__(self, iterator: Iterator[Any], readahead: int, executor: Optional[Executor]) -> None:
+        self._iterator = iterator
+        self._readahead = readahead
+        self._executor = executor
+        self._queue: Optional[asyncio.Queue[tuple[bool, Any]]] = None
+        self._producer: Optional[asyncio.Task[None]] = None
+
+    async def next(self) -> Any:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._readahead)
+            self._producer = asyncio.ensure_future(self._produce(self._queue))
+        is_item, value = await self._queue.get()
+        if is_item:
+            return value
+        if value is None:
+            raise StopAsyncIteration
+        raise value
+
+    async def _produce(self, queue: "asyncio.Queue[tuple[bool, Any]]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                item = await loop.run_in_executor(self._executor, next, self._iterator, _EXHAUSTED)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # Raised in the consumer by next()
+                await queue.put((False, error))
+                return
+            if item is _EXHAUSTED:
+                await queue.put((False, None))
+                return
+            await queue.put((True, item))
+
+    def cancel(self) -> None:
+        if self._producer is not None:
+            self._producer.cancel()
+
+
+_EXHAUSTED = object()
+
+
 def tarange(*args: Any, **kwargs: Any) -> stqdm_asyncio:
     """Shortcut for `stqdm_asyncio(range(*args), **kwargs)`."""
     return stqdm_asyncio(range(*args), **kwargs)
@@ -0,0 +1,197 @@
+"""Thin wrappers around `concurrent.futures` reporting progress to a single stqdm bar.
+
+Equivalent of `tqdm.contrib.concurrent` for Streamlit, plus executors propagating `stqdm.scope` to worker threads.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ALL_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing.context import BaseContext
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+from typing_extensions import Unpack
+
+from stqdm.stqdm import stqdm
+from stqdm.types import STQDMArgs
+
+if TYPE_CHECKING:
+    from streamlit.runtime.scriptrunner import ScriptRunContext
+
+__all__ = ["ScopedThreadPoolExecutor", "process_map", "propagate_scope"]
+
+T = TypeVar("T")
+
+# Set in each worker process by _init_worker_progress
+_worker_progress_slots: Any = None  # pylint: disable=invalid-name
+_worker_progress_slot: int = 0  # pylint: disable=invalid-name
+
+
+def _init_worker_progress(progress_slots: Any, next_slot: Any) -> None:
+    # Each worker owns one slot of the shared array, so increments never need a cross-process lock
+    global _worker_progress_slots, _worker_progress_slot  # pylint: disable=global-statement
+    with next_slot.get_lock():
+        _worker_progress_slot = next_slot.value % len(progress_slots)
+        next_slot.value += 1
+    _worker_progress_slots = progress_slots
+
+
+def _run_chunk(fn: Callable[..., Any], chunk: list[tuple[Any, ...]]) -> list[Any]:
+    results = []
+    for args in chunk:
+        results.append(fn(*args))
+        _worker_progress_slots[_worker_progress_slot] += 1
+    return results
+
+
+def process_map(  # pylint: disable=too-many-locals
+    fn: Callable[..., Any],
+    *iterables: Iterable[Any],
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    poll_interval: float = 0.1,
+    mp_context: Optional[BaseContext] = None,
+    **tqdm_kwargs: Unpack[STQDMArgs],
+) -> list[Any]:
+    """Equivalent of `list(map(fn, *iterables))` running in a `ProcessPoolExecutor` with a stqdm progress bar.
+
+    Workers count processed items in shared memory, one slot per worker.
+    The calling thread polls those counters every `poll_interval` seconds and renders a single bar,
+    so the bar moves item by item even with large chunks, without sending results back to move it.
+
+    Args:
+        fn (Callable): The function to apply. It must be picklable, typically a module level function.
+        *iterables (Iterable): The iterables to map over, as in `map`.
+        max_workers (Optional[int]): Number of worker processes. Defaults to the number of CPUs.
+        chunksize (int): Number of items sent to a worker at once.
+        ordered (bool): If True, results are returned in input order, otherwise in completion order (chunk by chunk).
+        poll_interval (float): Time in seconds between two reads of the shared counters.
+        mp_context (Optional[BaseContext]): The multiprocessing context used for the workers and shared memory.
+        **tqdm_kwargs (Unpack[STQDMArgs]): Arguments of the stqdm progress bar.
+
+    Returns:
+        list[Any]: The results of `fn`.
+
+    Raises:
+        ValueError: If chunksize is lower than 1.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be >= 1.")
+    items = list(zip(*iterables))
+    chunks = [items[start : start + chunksize] for start in range(0, len(items), chunksize)]
+    tqdm_kwargs.setdefault("total", len(items))
+    max_workers = max_workers or os.cpu_count() or 1
+    context = mp_context or multiprocessing.get_context()
+    progress_slots = context.Array("Q", max_workers, lock=False)
+    next_slot = context.Value("i", 0)
+
+    results: list[Any] = []
+    with (
+        stqdm(**tqdm_kwargs) as progress_bar,
+        ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker_progress,
+            initargs=(progress_slots, next_slot),
+        ) as executor,
+    ):
+        futures = [executor.submit(_run_chunk, fn, chunk) for chunk in chunks]
+        pending: set[Future[list[Any]]] = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=poll_interval, return_when=ALL_COMPLETED)
+                progress_bar.update(sum(progress_slots) - progress_bar.n)
+                if not ordered:
+                    for future in done:
+                        results.extend(future.result())
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    if ordered:
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def _get_script_run_ctx() -> Optional["ScriptRunContext"]:
+    if "streamlit" not in sys.modules:
+        return None
+    # Streamlit is imported lazily, see stqdm.stqdm
+    from streamlit.runtime.scriptrunner import get_script_run_ctx  # pylint: disable=import-outside-toplevel
+
+    return get_script_run_ctx(suppress_warning=True)
+
+
+@contextmanager
+def _attached_script_run_ctx(script_run_ctx: "ScriptRunContext") -> Iterator[None]:
+    """Attaches a ScriptRunContext to the current thread, then restores the previous one.
+
+    Streamlit drops the elements sent from threads without a ScriptRunContext. Pooled threads run the tasks of other
+    callers afterwards, they must not keep the context, nor the session, of a previous task.
+    """
+    # pylint: disable=import-outside-toplevel
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+    from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+
+    thread = threading.current_thread()
+    previous_script_run_ctx = _get_script_run_ctx()
+    add_script_run_ctx(thread, script_run_ctx)
+    try:
+        yield
+    finally:
+        if previous_script_run_ctx is None:
+            # add_script_run_ctx cannot detach a context
+            delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+        else:
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous_script_run_ctx)
+
+
+def propagate_scope(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wraps fn to run it in the context of the caller of propagate_scope, typically before submitting it to a thread.
+
+    Threads do not inherit context variables, so bars created in a worker thread ignore the active `stqdm.scope`.
+    The context is captured when propagate_scope is called, each call of the wrapper runs in its own copy of it.
+    The Streamlit ScriptRunContext of the caller, if any, is attached to the thread running the wrapper as well,
+    while it runs, so that bars created by the worker render in the frontend of the caller's session.
+
+    Examples:
+        >>> with stqdm.scope(frontend=False, backend=True):
+        ...     thread = threading.Thread(target=propagate_scope(process_batch), args=(batch,))
+
+    Args:
+        fn (Callable): The function to wrap.
+
+    Returns:
+        Callable: fn running in the captured context.
+    """
+    context = contextvars.copy_context()
+    script_run_ctx = _get_script_run_ctx()
+
+    @functools.wraps(fn)
+    def run_in_captured_context(*args: Any, **kwargs: Any) -> T:
+        if script_run_ctx is None:
+            # A context cannot be entered by two threads at once
+            return context.copy().run(fn, *args, **kwargs)
+        with _attached_script_run_ctx(script_run_ctx):
+            return context.copy().run(fn, *args, **kwargs)
+
+    return run_in_captured_context
+
+
+class ScopedThreadPoolExecutor(ThreadPoolExecutor):
+    """A ThreadPoolExecutor running the submitted callables in the context of the caller of submit (or map).
+
+    Bars created by the workers then honor the `stqdm.scope` active when the work was submitted, and render in the
+    frontend of the Streamlit session that submitted it.
+    """
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        return super().submit(propagate_scope(fn), *args, **kwargs)
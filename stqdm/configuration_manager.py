@@ -1,36 +1,167 @@
+import threading
 from contextlib import contextmanager
 from contextvars import ContextVar
-from typing import Any, Generic, Iterator, Mapping, TypeVar, cast
+from types import MappingProxyType
+from typing import Any, Callable, Generic, ItemsView, Iterator, KeysView, Mapping, Optional, TypeVar, ValuesView, cast
 
 Config = TypeVar("Config", bound=Mapping[str, Any])
 
 
+class LayeredConfig(Mapping[str, Any]):
+    """A read-only configuration made of frozen layers, a key takes its value from the last layer defining it.
+
+    Layers are shared, never copied. The flattened dict is built with the config, reads go straight to it.
+    Adding a layer on top of a config builds a new config of two layers: the flattened view of that config,
+    shared by all the configs built on it, and the new layer. Building it, or merging a layer with `merged`,
+    copies the flattened dict once, whatever the depth.
+    """
+
+    __slots__ = ("_layers", "_flattened", "_frozen")
+
+    def __init__(self, *layers: Mapping[str, Any]) -> None:
+        """Initializes the config with layers that must not be mutated anymore, see `freeze`."""
+        self._layers = layers
+        self._flattened: dict[str, Any] = {}
+        for layer in layers:
+            self._flattened.update(layer)
+        self._frozen: Optional[Mapping[str, Any]] = None
+
+    @staticmethod
+    def freeze(layer: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Returns a read-only copy of layer, that can be used as a layer."""
+        return MappingProxyType(dict(layer))
+
+    @property
+    def layers(self) -> tuple[Mapping[str, Any], ...]:
+        """The layers of the config, from the bottom to the top."""
+        return self._layers
+
+    def with_layer(self, layer: Mapping[str, Any]) -> "LayeredConfig":
+        """Returns a new config with a frozen copy of layer on top of the flattened view of this config."""
+        if not layer:
+            return self
+        return LayeredConfig(self._frozen_view(), self.freeze(layer))
+
+    def merged(self, layer: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Returns a read-only flattened copy of this config with layer on top, that does not keep its layers.
+
+        This is the cheapest way to build a config that is not layered on anymore, such as the config of a bar.
+        """
+        return MappingProxyType({**self._flattened, **layer})
+
+    def _frozen_view(self) -> Mapping[str, Any]:
+        frozen = self._frozen
+        if frozen is None:
+            # A single layer is already frozen, the flattened dict is never mutated once built
+            frozen = self._frozen = self._layers[0] if len(self._layers) == 1 else MappingProxyType(self._flattened)
+        return frozen
+
+    # The Mapping mixins would call __getitem__ for each key, read the flattened dict directly instead
+
+    def __getitem__(self, key: str) -> Any:
+        return self._flattened[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._flattened.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._flattened
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._flattened)
+
+    def __len__(self) -> int:
+        return len(self._flattened)
+
+    def keys(self) -> KeysView[str]:
+        return self._flattened.keys()
+
+    def values(self) -> ValuesView[Any]:
+        return self._flattened.values()
+
+    def items(self) -> ItemsView[str, Any]:
+        return self._flattened.items()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._flattened!r})"
+
+
+class _ScopeFrame:
+    """A level of the scope stack: its frozen scope configuration, and the default and all levels up to it, layered.
+
+    The layered config is built once per default configuration: it is cached with the default configuration
+    it was built on, and rebuilt when the default changes (set_default_config, session defaults).
+    """
+
+    __slots__ = ("config", "parent", "_layered")
+
+    def __init__(self, config: Mapping[str, Any], parent: Optional["_ScopeFrame"]) -> None:
+        self.config = config
+        self.parent = parent
+        self._layered: Optional[tuple[LayeredConfig, LayeredConfig]] = None
+
+    def layered(self, default_config: LayeredConfig) -> LayeredConfig:
+        """Returns the default_config and the scopes up to this one as a LayeredConfig."""
+        # Read and written as a single tuple, so that concurrent readers never mix two defaults
+        cached = self._layered
+        if cached is None or cached[0] is not default_config:
+            if self.parent is None:
+                base = default_config
+            else:
+                base = self.parent.layered(default_config)
+            cached = self._layered = (default_config, base.with_layer(self.config))
+        return cached[1]
+
+
 class ScopeManager(Generic[Config]):
     """A Manager for handling scoped configurations with a stack to maintain context states.
 
     This helps handling `scope` context manager and has a default configuration (specific level-0 scope).
     This is a generic class made to handle `Mapping`s. Those will be tqdm + stqdm configurations parameters.
+    Sessions (Streamlit sessions for stqdm) can also have their own default configuration, layered on top
+    of the global default configuration.
 
     Attributes:
         default_config (Config): The default configuration. This is a specific scope (level-0 scope).
             By default, it does not behave in the same way as other scope.
             It's argument are kept unless overridden by the latest scope in the stack.
-        _scope_stack (list[Config]): A list that tracks all active scope configurations.
+        _scope_stack (ContextVar[tuple[_ScopeFrame, ...]]): The active scopes, from outermost to innermost.
+            Each frame caches the layered configuration at its level, so that a merge only adds the provided layer.
+        _default (LayeredConfig): The global default configuration. It is replaced, never mutated,
+            which invalidates the configurations cached by the frames.
+        _session_defaults (dict[str, tuple[LayeredConfig, Mapping, LayeredConfig]]): By session id, the global
+            default the session default was layered on, the session layer, and the resulting default.
+
+    Configurations returned by the ScopeManager are read-only views (LayeredConfig or frozen layers),
+    they share their layers instead of copying them.
     """
 
-    def __init__(self, default_config: Config) -> None:
+    def __init__(
+        self,
+        default_config: Config,
+        get_session_id: Optional[Callable[[], Optional[str]]] = None,
+        is_session_active: Optional[Callable[[str], bool]] = None,
+    ) -> None:
         """Initializes the ScopeManager with a default configuration.
 
         Args:
             default_config (Config): The default configuration dictionary.
+            get_session_id (Optional[Callable[[], Optional[str]]]): Returns the id of the current session,
+                None outside of a session. Required by the session default configurations.
+            is_session_active (Optional[Callable[[str], bool]]): Returns False once a session ended,
+                so that its default configuration is evicted. Sessions are never evicted if not provided.
 
         Raises:
             TypeError: If the default_config is not an instance of Mapping.
         """
         if not isinstance(default_config, Mapping):
             raise TypeError("Config is not an instance of Mapping.")
-        self._default_config = cast(Config, dict(default_config))
-        self._scope_stack: ContextVar[tuple[dict[str, Any], ...]] = ContextVar("scope_stack", default=())
+        self._default = LayeredConfig(LayeredConfig.freeze(default_config))
+        self._scope_stack: ContextVar[tuple[_ScopeFrame, ...]] = ContextVar("scope_stack", default=())
+        self._get_session_id = get_session_id
+        self._is_session_active = is_session_active
+        self._session_defaults: dict[str, tuple[LayeredConfig, Mapping[str, Any], LayeredConfig]] = {}
+        self._session_defaults_lock = threading.Lock()
 
     def set_default_config(self, default_config: Config) -> None:
         """Sets the default configuration of the ScopeManager.
@@ -40,15 +171,107 @@ class ScopeManager(Generic[Config]):
         """
         if not isinstance(default_config, Mapping):
             raise TypeError("Config is not an instance of Mapping.")
-        self._default_config = cast(Config, dict(default_config))
+        self._default = LayeredConfig(LayeredConfig.freeze(default_config))
 
     def get_default_config(self) -> Config:
         """Retrieves the current default configuration.
 
         Returns:
-            Config: The default configuration.
+            Config: A read-only view of the default configuration.
         """
-        return self._default_config
+        return cast(Config, self._default)
+
+    ###
+    # Session default configurations
+    ###
+
+    def _resolve_session_id(self, session_id: Optional[str]) -> str:
+        if session_id is None and self._get_session_id is not None:
+            session_id = self._get_session_id()
+        if session_id is None:
+            raise RuntimeError("No session is running, use set_default_config to change the global default.")
+        return session_id
+
+    def set_session_default_config(self, default_config: Config, session_id: Optional[str] = None) -> None:
+        """Sets the default configuration of a session. It overrides the global default configuration in this session.
+
+        Entries of ended sessions are evicted when a session default configuration is set or cleared.
+
+        Args:
+            default_config (Config): The configuration to set as default in the session.
+            session_id (Optional[str]): The session, the current one if None.
+
+        Raises:
+            TypeError: If the default_config is not an instance of Mapping.
+            RuntimeError: If no session id is given and no session is running.
+        """
+        if not isinstance(default_config, Mapping):
+            raise TypeError("Config is not an instance of Mapping.")
+        session_id = self._resolve_session_id(session_id)
+        session_layer = LayeredConfig.freeze(default_config)
+        global_default = self._default
+        with self._session_defaults_lock:
+            self._evict_ended_sessions()
+            self._session_defaults[session_id] = (
+                global_default,
+                session_layer,
+                global_default.with_layer(session_layer),
+            )
+
+    def clear_session_default_config(self, session_id: Optional[str] = None) -> None:
+        """Removes the default configuration of a session, which goes back to the global default configuration.
+
+        Args:
+            session_id (Optional[str]): The session, the current one if None.
+        """
+        session_id = self._resolve_session_id(session_id)
+        with self._session_defaults_lock:
+            self._session_defaults.pop(session_id, None)
+            self._evict_ended_sessions()
+
+    def _evict_ended_sessions(self) -> None:
+        if self._is_session_active is None:
+            return
+        for session_id in [session_id for session_id in self._session_defaults if not self._is_session_active(session_id)]:
+            del self._session_defaults[session_id]
+
+    def get_session_default_config(self, session_id: Optional[str] = None) -> Config:
+        """Retrieves the default configuration applying in a session: the global default and the session default.
+
+        Args:
+            session_id (Optional[str]): The session, the current one if None.
+
+        Returns:
+            Config: A read-only view of the default configuration of the session.
+        """
+        if session_id is None and self._get_session_id is not None:
+            session_id = self._get_session_id()
+        return cast(Config, self._get_effective_default(session_id))
+
+    def _get_effective_default(self, session_id: Optional[str]) -> LayeredConfig:
+        global_default = self._default
+        session_default = self._session_defaults.get(session_id) if session_id is not None else None
+        if session_default is None:
+            return global_default
+        layered_on, session_layer, effective_default = session_default
+        if layered_on is not global_default:
+            # The global default changed since the session default was set
+            effective_default = global_default.with_layer(session_layer)
+            with self._session_defaults_lock:
+                # Unless the session default was cleared, replaced or evicted in the meantime
+                if self._session_defaults.get(cast(str, session_id)) is session_default:
+                    self._session_defaults[cast(str, session_id)] = (global_default, session_layer, effective_default)
+        return effective_default
+
+    def _get_current_default(self) -> LayeredConfig:
+        if not self._session_defaults or self._get_session_id is None:
+            # Avoid looking the session up when no session has its own default
+            return self._default
+        return self._get_effective_default(self._get_session_id())
+
+    ###
+    # Scopes
+    ###
 
     @contextmanager
     def scope(self, scope_config: Config) -> Iterator[Config]:
@@ -58,15 +281,17 @@ class ScopeManager(Generic[Config]):
             scope_config (Config): The temporary configuration for the scope.
 
         Yields:
-            Config: The provided configuration.
+            Config: A read-only copy of the provided configuration.
         """
         if not isinstance(scope_config, Mapping):
             raise TypeError("Config is not an instance of Mapping.")
-        scope_snapshot = cast(Config, dict(scope_config))
         current_stack = self._scope_stack.get()
-        scope_token = self._scope_stack.set((*current_stack, cast(dict[str, Any], scope_snapshot)))
+        frame = _ScopeFrame(LayeredConfig.freeze(scope_config), current_stack[-1] if current_stack else None)
+        # Layer once when entering the scope, instead of at every merge
+        frame.layered(self._get_current_default())
+        scope_token = self._scope_stack.set((*current_stack, frame))
         try:
-            yield scope_snapshot
+            yield cast(Config, frame.config)
         finally:
             self._scope_stack.reset(scope_token)
 
@@ -74,12 +299,12 @@ class ScopeManager(Generic[Config]):
         """Retrieves the configuration of the current scope.
 
         Returns:
-            Config: The active scope configuration if any, otherwise an empty dictionary.
+            Config: A read-only view of the active scope configuration if any, otherwise an empty mapping.
         """
         current_stack = self._scope_stack.get()
         if current_stack:
-            return cast(Config, current_stack[-1])
-        return cast(Config, {})
+            return cast(Config, current_stack[-1].config)
+        return cast(Config, MappingProxyType({}))
 
     def use_current_default_if_config_not_provided(self, config: Config) -> Config:
         """Merges the provided configuration with the defaults and active scope configurations.
@@ -87,6 +312,7 @@ class ScopeManager(Generic[Config]):
         This is the logic that implements the default merge for configurations.
         The new config is the latest provided values in order:
         - default_config (less important)
+        - the default config of the current session, if any
         - active scopes, from outermost to innermost
         - current_config (stqdm call params) (most important)
 
@@ -94,10 +320,12 @@ class ScopeManager(Generic[Config]):
             config (Config): The configuration to merge with defaults and current scope.
 
         Returns:
-            Config: The resulting configuration after merging.
+            Config: The resulting configuration after merging, as a read-only flattened mapping.
         """
-        merged_config = dict(self._default_config)
-        for scope_config in self._scope_stack.get():
-            merged_config.update(scope_config)
-        merged_config.update(config)
-        return cast(Config, merged_config)
+        default_config = self._get_current_default()
+        current_stack = self._scope_stack.get()
+        if current_stack:
+            layered_config = current_stack[-1].layered(default_config)
+        else:
+            layered_config = default_config
+        return cast(Config, layered_config.merged(config))
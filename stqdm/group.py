@@ -0,0 +1,304 @@
+"""Render many stqdm bars as a single Streamlit element."""
+
+# Streamlit is imported lazily, see stqdm.stqdm
+# pylint: disable=import-outside-toplevel
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import weakref
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Optional
+
+from typing_extensions import Unpack
+
+from stqdm.telemetry import PROGRESS_PAYLOAD_BYTES, global_render_stats
+from stqdm.types import STQDMArgs
+
+if TYPE_CHECKING:
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.runtime.scriptrunner import ScriptRunContext
+
+    from stqdm.stqdm import stqdm
+
+__all__ = ["stqdm_group", "stqdm_summary_group"]
+
+# Default minimum time in seconds between two renders of a group
+DEFAULT_GROUP_FRONTEND_MININTERVAL = 0.1
+
+
+def _get_script_run_ctx() -> Optional["ScriptRunContext"]:
+    if "streamlit" not in sys.modules:
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def _can_render() -> bool:
+    """Streamlit drops the elements sent from threads without a ScriptRunContext, such as executor workers."""
+    from stqdm.stqdm import has_script_run_context
+
+    return has_script_run_context()
+
+
+class stqdm_group:  # pylint: disable=invalid-name
+    """A group of progress bars rendered together, as the rows of one table, in a single Streamlit element.
+
+    Bars join the group with `frontend_group=group` (or `group.bar(...)`). Instead of sending their own updates,
+    they notify the group, which renders all of its bars at once, at most every `frontend_mininterval` seconds.
+    With 20 bars, this is 1 message per tick instead of up to 20.
+    Rows are kept in creation order. Closed bars keep their row, unless they were created with leave=False.
+    The latest state is always rendered when the last bar closes and when the group closes.
+    Bars can be advanced from threads without a Streamlit ScriptRunContext, such as executor workers:
+    their updates are rendered by a renderer thread attached to the ScriptRunContext of the group.
+
+    Examples:
+        >>> with stqdm_group() as group:
+        ...     for name, urls in jobs.items():
+        ...         executor.submit(download_all, urls, group.bar(total=len(urls), desc=name))
+
+    Attributes:
+        frontend_mininterval (float): Minimum time in seconds between two renders of the group.
+    """
+
+    def __init__(
+        self,
+        st_container: Optional["DeltaGenerator"] = None,
+        frontend_mininterval: float = DEFAULT_GROUP_FRONTEND_MININTERVAL,
+    ) -> None:
+        """Initializes an empty group.
+
+        Args:
+            st_container (Optional[DeltaGenerator]): The Streamlit container of the group,
+                st.container() at the first render if not provided.
+            frontend_mininterval (float): Minimum time in seconds between two renders of the group.
+        """
+        self.frontend_mininterval = frontend_mininterval
+        self._st_container = st_container
+        self._st_table: Optional["DeltaGenerator"] = None
+        # Ordered by insertion, keyed by id so that bars do not need to be hashable
+        self._bars: dict[int, "stqdm"] = {}
+        self._lock = threading.RLock()
+        self._last_render_t = float("-inf")
+        self._pending = False
+        self._last_rows: Optional[list[tuple[Optional[float], Optional[str]]]] = None
+        # The group renders from threads of other contexts with this ScriptRunContext, see _start_renderer
+        self._script_run_ctx = _get_script_run_ctx()
+        self._renderer: Optional[threading.Thread] = None
+        self._renderer_stop = threading.Event()
+
+    def bar(  # pylint: disable=disallowed-name
+        self, iterable: Optional[Iterable[Any]] = None, **kwargs: Unpack[STQDMArgs]
+    ) -> "stqdm":
+        """Creates a stqdm bar in this group.
+
+        Args:
+            iterable (Optional[Iterable]): The iterable to wrap with the progress bar.
+            **kwargs (Unpack[STQDMArgs]): Arguments of stqdm.
+
+        Returns:
+            stqdm: The new bar.
+        """
+        from stqdm.stqdm import stqdm
+
+        kwargs["frontend_group"] = self
+        return stqdm(iterable, **kwargs)
+
+    @property
+    def created_by_script(self) -> bool:
+        """True if the group was created by a Streamlit script. Its bars can then be created from any thread."""
+        return self._script_run_ctx is not None
+
+    @property
+    def st_table(self) -> "DeltaGenerator":
+        """Lazily creates and returns the placeholder rendering the group."""
+        if self._st_table is None:
+            if self._st_container is None:
+                import streamlit as st
+
+                self._st_container = st.container()
+            self._st_table = self._st_container.empty()
+        return self._st_table
+
+    def request_render(self, progress_bar: "stqdm") -> None:
+        """Called by the bars of the group when their state changed. Renders unless the last render is too recent."""
+        with self._lock:
+            self._bars.setdefault(id(progress_bar), progress_bar)
+            if not _can_render():
+                self._pending = True
+                self._start_renderer()
+                return
+            if time.monotonic() - self._last_render_t < self.frontend_mininterval:
+                self._pending = True
+                return
+            self._render()
+
+    def discard(self, progress_bar: "stqdm") -> None:
+        """Removes the row of a bar. Used by bars closing with leave=False."""
+        with self._lock:
+            if self._bars.pop(id(progress_bar), None) is not None:
+                self._pending = True
+
+    def bar_closed(self, progress_bar: "stqdm") -> None:  # pylint: disable=unused-argument
+        """Called by the bars of the group when they close. Renders the latest state once all the bars are closed."""
+        with self._lock:
+            if all(group_bar.disable for group_bar in self._bars.values()):
+                self.flush()
+
+    def flush(self) -> None:
+        """Renders the latest state if a render was skipped since the last one.
+
+        From a thread without ScriptRunContext, the render is left to the renderer thread of the group.
+        """
+        with self._lock:
+            if self._pending and _can_render():
+                self._render()
+
+    def close(self) -> None:
+        """Stops the renderer thread, if any, and renders the latest state of the group."""
+        self._stop_renderer()
+        self.flush()
+
+    def _start_renderer(self) -> None:
+        if self._renderer is not None:
+            return
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+        self._renderer_stop.clear()
+        # The thread only keeps a weak reference so that an unclosed group can still be garbage collected
+        self._renderer = threading.Thread(
+            target=self._run_renderer,
+            args=(weakref.ref(self), self._renderer_stop, self.frontend_mininterval or DEFAULT_GROUP_FRONTEND_MININTERVAL),
+            name="stqdm-group-renderer",
+            daemon=True,
+        )
+        add_script_run_ctx(self._renderer, self._script_run_ctx)
+        self._renderer.start()
+
+    @staticmethod
+    def _run_renderer(group_ref: "weakref.ref[stqdm_group]", stop: threading.Event, interval: float) -> None:
+        while not stop.wait(interval):
+            group = group_ref()
+            if group is None:
+                return
+            with group._lock:  # pylint: disable=protected-access
+                group.flush()
+                if all(progress_bar.disable for progress_bar in group._bars.values()):  # pylint: disable=protected-access
+                    # Started again by the next update from another thread
+                    group._renderer = None  # pylint: disable=protected-access
+                    return
+            del group
+
+    def _stop_renderer(self) -> None:
+        with self._lock:
+            renderer, self._renderer = self._renderer, None
+        if renderer is None:
+            return
+        self._renderer_stop.set()
+        if renderer is not threading.current_thread():
+            renderer.join()
+
+    def __enter__(self) -> "stqdm_group":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _render(self) -> None:
+        self._pending = False
+        self._last_render_t = time.monotonic()
+        rows = [progress_bar.format_frontend(**progress_bar.frontend_format_dict) for progress_bar in self._bars.values()]
+        if rows == self._last_rows:
+            return
+        self._last_rows = rows
+        if not rows:
+            self.st_table.empty()
+            global_render_stats.record(deltas=1)
+            return
+
+        import streamlit as st
+
+        self.st_table.dataframe(
+            {
+                "progress": [None if progress is None else progress * 100 for progress, _ in rows],
+                "status": [text or "" for _, text in rows],
+            },
+            column_config={
+                "progress": st.column_config.ProgressColumn("Progress", format="%.0f%%", min_value=0, max_value=100),
+                "status": st.column_config.TextColumn("Status"),
+            },
+            hide_index=True,
+        )
+        global_render_stats.record(
+            deltas=1,
+            payload_bytes=sum(
+                (PROGRESS_PAYLOAD_BYTES if progress is not None else 0) + len((text or "").encode()) for progress, text in rows
+            ),
+        )
+
+
+class stqdm_summary_group(stqdm_group):  # pylint: disable=invalid-name
+    """A group rendering all of its bars as a single summary progress bar.
+
+    The summary sums the counters and totals of the bars, and counts running and finished bars.
+    Closed bars are folded into the summary and released, so thousands of short bars cost a constant memory.
+    Unlike stqdm_group, closing a bar does not force a render: the group renders at most every
+    `frontend_mininterval` seconds, and the latest state when the group closes.
+    This is the aggregation used by stqdm.patch.patch_tqdm.
+    """
+
+    def __init__(
+        self,
+        st_container: Optional["DeltaGenerator"] = None,
+        frontend_mininterval: float = DEFAULT_GROUP_FRONTEND_MININTERVAL,
+    ) -> None:
+        super().__init__(st_container=st_container, frontend_mininterval=frontend_mininterval)
+        self._finished_bars = 0
+        self._finished_n: float = 0
+        self._finished_total: float = 0
+        self._last_desc: Optional[str] = None
+        self._last_summary: Optional[tuple[Optional[float], str]] = None
+
+    def discard(self, progress_bar: "stqdm") -> None:
+        # Rows are not displayed, the bar is folded into the summary when it closes
+        pass
+
+    def bar_closed(self, progress_bar: "stqdm") -> None:
+        with self._lock:
+            if self._bars.pop(id(progress_bar), None) is None:
+                return
+            self._finished_bars += 1
+            self._finished_n += progress_bar.n
+            self._finished_total += progress_bar.total or 0
+            self._last_desc = progress_bar.desc or self._last_desc
+            self._pending = True
+            if not _can_render():
+                self._start_renderer()
+            elif time.monotonic() - self._last_render_t >= self.frontend_mininterval:
+                self._render()
+
+    def _render(self) -> None:
+        self._pending = False
+        self._last_render_t = time.monotonic()
+        running = list(self._bars.values())
+        n = self._finished_n + sum(progress_bar.n for progress_bar in running)
+        total = self._finished_total + sum(progress_bar.total or 0 for progress_bar in running)
+        desc = next((progress_bar.desc for progress_bar in reversed(running) if progress_bar.desc), self._last_desc)
+        counter = f"{n:g}/{total:g}" if total else f"{n:g}"
+        text = f"{len(running)} running, {self._finished_bars} finished, {counter}"
+        if desc:
+            text = f"{desc.rstrip(': ')}: {text}"
+        progress = min(n / total, 1.0) if total else None
+        summary = (None if progress is None else round(progress * 100), text)
+        if summary == self._last_summary:
+            return
+        self._last_summary = summary
+        if progress is None:
+            self.st_table.write(text)
+        else:
+            self.st_table.progress(progress, text=text)
+        global_render_stats.record(
+            deltas=1, payload_bytes=len(text.encode()) + (PROGRESS_PAYLOAD_BYTES if progress is not None else 0)
+        )
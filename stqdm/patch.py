@@ -0,0 +1,159 @@
+"""Route the tqdm bars of third-party libraries to Streamlit."""
+
+from __future__ import annotations
+
+import importlib
+import inspect
+import sys
+import threading
+from collections.abc import Iterable
+from contextlib import contextmanager
+from typing import Any, Generator, NamedTuple, Optional
+
+from tqdm.std import tqdm as std_tqdm
+from typing_extensions import Unpack
+
+from stqdm.group import stqdm_summary_group
+from stqdm.stqdm import get_script_session_id, has_script_run_context, stqdm
+from stqdm.types import STQDMArgs
+
+__all__ = ["patch_tqdm"]
+
+# Modules whose tqdm and trange attributes are replaced while patched
+PATCHED_MODULES = ("tqdm", "tqdm.std", "tqdm.auto", "tqdm.autonotebook", "tqdm.notebook")
+# Default minimum time in seconds between two renders of the summary of patched bars
+DEFAULT_PATCH_FRONTEND_MININTERVAL = 0.5
+
+# Names of tqdm's positional parameters after iterable, libraries often call tqdm(iterable, "desc")
+_TQDM_POSITIONAL_PARAMETERS = tuple(inspect.signature(std_tqdm.__init__).parameters)[2:]
+
+
+class _PatchPolicy(NamedTuple):
+    group: Optional[stqdm_summary_group]
+    config: STQDMArgs
+
+
+_patch_lock = threading.Lock()
+_patch_count = 0  # pylint: disable=invalid-name
+_original_attributes: list[tuple[Any, str, Any]] = []
+# Active patch_tqdm contexts, by Streamlit session (None outside of Streamlit). The innermost one applies.
+_policies: dict[Optional[str], list[_PatchPolicy]] = {}
+
+
+def _find_policy() -> tuple[Optional[str], Optional[_PatchPolicy]]:
+    """Returns the session of the caller and its innermost policy.
+
+    Threads started by a script, such as executor workers, have no session: they use the policies of the only
+    session patching tqdm, if there is a single one.
+    """
+    session_id = get_script_session_id()
+    with _patch_lock:
+        session_policies = _policies.get(session_id)
+        if not session_policies and session_id is None:
+            sessions = [other_session_id for other_session_id in _policies if other_session_id is not None]
+            if len(sessions) == 1:
+                session_id = sessions[0]
+                session_policies = _policies[session_id]
+        return session_id, session_policies[-1] if session_policies else None
+
+
+class patched_tqdm(stqdm):  # pylint: disable=invalid-name
+    """The class replacing tqdm while patched. It accepts tqdm's positional arguments.
+
+    Bars created in a session with an active patch_tqdm use its configuration and summary group, as well as the bars
+    created by the threads it started, as long as a single session patches tqdm.
+    Bars created outside of a Streamlit script keep writing to the terminal, as tqdm would.
+    """
+
+    # Same signature as tqdm's __init__
+    def __init__(self, iterable: Optional[Iterable[Any]] = None, *args: Any, **kwargs: Any) -> None:  # pylint: disable=keyword-arg-before-vararg
+        kwargs.update(zip(_TQDM_POSITIONAL_PARAMETERS, args))
+        session_id, policy = _find_policy()
+        if policy is not None:
+            group, config = policy
+            kwargs = {**config, **kwargs}
+            if group is not None:
+                kwargs.setdefault("frontend_group", group)
+        kwargs.setdefault("backend", session_id is None and not has_script_run_context())
+        super().__init__(iterable, **kwargs)
+
+
+def patched_trange(*args: Any, **kwargs: Any) -> patched_tqdm:
+    """Replaces tqdm's trange while patched."""
+    return patched_tqdm(range(*args), **kwargs)
+
+
+_REPLACEMENTS = {"tqdm": patched_tqdm, "trange": patched_trange}
+
+
+def _patch_modules() -> None:
+    for module_name in PATCHED_MODULES:
+        try:
+            module = sys.modules.get(module_name) or importlib.import_module(module_name)
+        except ImportError:
+            continue
+        for name, replacement in _REPLACEMENTS.items():
+            if hasattr(module, name):
+                _original_attributes.append((module, name, getattr(module, name)))
+                setattr(module, name, replacement)
+
+
+def _unpatch_modules() -> None:
+    while _original_attributes:
+        module, name, original = _original_attributes.pop()
+        # Leave attributes that were replaced again in the meantime
+        if getattr(module, name) is _REPLACEMENTS[name]:
+            setattr(module, name, original)
+
+
+@contextmanager
+def patch_tqdm(aggregate: bool = True, **config: Unpack[STQDMArgs]) -> Generator[Optional[stqdm_summary_group], None, None]:
+    """Replaces tqdm with stqdm in tqdm, tqdm.std, tqdm.auto, tqdm.autonotebook and tqdm.notebook, then restores it.
+
+    Libraries looking tqdm up when they create a bar (`import tqdm; tqdm.tqdm(...)`) display in Streamlit.
+    Libraries that imported the class before the patch (`from tqdm import tqdm` at import time) are not affected.
+    Patching is reference counted and thread-safe: concurrent sessions and nested contexts can patch,
+    tqdm is restored when the last context exits. Each session uses the configuration of its innermost context.
+
+    Examples:
+        >>> with patch_tqdm(desc="Downloading"):
+        ...     model = load_model_from_hub()
+
+    Args:
+        aggregate (bool): If True (default), all the patched bars of the session are rendered as a single summary
+            progress bar, see stqdm_summary_group. Otherwise, each bar renders its own widget.
+        **config (Unpack[STQDMArgs]): Default stqdm arguments of the patched bars. With aggregate=True,
+            st_container and frontend_mininterval (DEFAULT_PATCH_FRONTEND_MININTERVAL by default) apply to the summary.
+
+    Yields:
+        Optional[stqdm_summary_group]: The summary group if aggregate is True, None otherwise.
+    """
+    global _patch_count  # pylint: disable=global-statement
+    group: Optional[stqdm_summary_group] = None
+    if aggregate:
+        group = stqdm_summary_group(
+            st_container=config.pop("st_container", None),
+            frontend_mininterval=config.pop("frontend_mininterval", DEFAULT_PATCH_FRONTEND_MININTERVAL),
+        )
+    else:
+        config.setdefault("frontend_mininterval", DEFAULT_PATCH_FRONTEND_MININTERVAL)
+    policy = _PatchPolicy(group, config)
+    session_id = get_script_session_id()
+    with _patch_lock:
+        if _patch_count == 0:
+            _patch_modules()
+        _patch_count += 1
+        _policies.setdefault(session_id, []).append(policy)
+    try:
+        yield group
+    finally:
+        with _patch_lock:
+            session_policies = _policies[session_id]
+            session_policies.remove(policy)
+            if not session_policies:
+                del _policies[session_id]
+            _patch_count -= 1
+            if _patch_count == 0:
+                _unpatch_modules()
+        if group is not None:
+            group.close()
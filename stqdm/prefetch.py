@@ -0,0 +1,98 @@
+"""Pull items of a slow iterable from a background thread while the loop body runs."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+
+__all__ = ["PrefetchIterator"]
+
+# Time in seconds between two checks of the stop flag by a producer blocked on a full buffer
+_STOP_POLL_INTERVAL = 0.1
+
+
+class _End:
+    """Marks the end of the source in the buffer, with the error that ended it, if any."""
+
+    def __init__(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+
+
+class PrefetchIterator(Iterator[Any]):
+    """Iterates over an iterable that a background thread reads up to `size` items ahead.
+
+    The thread starts on the first call to next(), so creating the iterator never consumes the source.
+    Errors raised by the source are raised by next() in the consuming thread, after the items read before them.
+    This is used by stqdm(prefetch=N).
+
+    Attributes:
+        size (int): The maximum number of items read ahead.
+    """
+
+    def __init__(self, iterable: Iterable[Any], size: int) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1.")
+        self.size = size
+        self._iterable = iterable
+        self._buffer: queue.Queue[Any] = queue.Queue(maxsize=size)
+        self._stop = threading.Event()
+        self._producer: Optional[threading.Thread] = None
+        self._done = False
+
+    @property
+    def buffered(self) -> int:
+        """The number of items read ahead and waiting to be consumed."""
+        return self._buffer.qsize()
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        if self._producer is None:
+            self._start()
+        item = self._buffer.get()
+        if isinstance(item, _End):
+            self._done = True
+            if item.error is not None:
+                raise item.error
+            raise StopIteration
+        return item
+
+    def _start(self) -> None:
+        self._producer = threading.Thread(target=self._produce, name="stqdm-prefetch", daemon=True)
+        self._producer.start()
+
+    def _produce(self) -> None:
+        try:
+            for item in self._iterable:
+                if not self._put(item):
+                    return
+        except BaseException as error:  # pylint: disable=broad-exception-caught
+            # Raised in the consumer by __next__
+            self._put(_End(error))
+            return
+        self._put(_End())
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._buffer.put(item, timeout=_STOP_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close(self) -> None:
+        """Stops the background thread once its current read of the source returns. Buffered items are dropped."""
+        self._done = True
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Waits for the background thread to stop, see close. Returns immediately if it was never started.
+
+        Args:
+            timeout (Optional[float]): The maximum time to wait in seconds, forever if None.
+        """
+        if self._producer is not None:
+            self._producer.join(timeout)
@@ -1,23 +1,200 @@
+# Streamlit is imported lazily so that headless usages (workers, batch jobs) never pay for its import
+# pylint: disable=import-outside-toplevel
+import functools
 import io
 import re
-from collections.abc import AsyncIterator, Iterable
+import string
+import sys
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any, Generator, Optional, cast
+from typing import TYPE_CHECKING, Any, Generator, NamedTuple, Optional, cast
 
-import streamlit as st
-from packaging import version
 from tqdm.auto import tqdm
 from typing_extensions import Unpack
 
 from stqdm.configuration_manager import ScopeManager
+from stqdm.telemetry import (
+    PROGRESS_PAYLOAD_BYTES,
+    LatencyHistogram,
+    RenderStats,
+    format_duration,
+    global_render_stats,
+)
+from stqdm.trace import get_active_recorder
 from stqdm.types import STQDMArgs
 
 # pragma: no cover
 if TYPE_CHECKING:
     from streamlit.delta_generator import DeltaGenerator
 
-IS_TEXT_INSIDE_PROGRESS_AVAILABLE = version.parse(st.__version__) >= version.parse("1.18.0")
+    from stqdm.group import stqdm_group
+    from stqdm.prefetch import PrefetchIterator
+    from stqdm.updates import ShardedCounter
+
 BAR_FORMAT_REGEX = re.compile(r"\{bar(?:[:!][a-zA-Z0-9]+){,2}}")
+# Streamlit renders st.progress as an integer percentage, finer steps are not visible by default
+DEFAULT_FRONTEND_PROGRESS_STEP = 0.01
+FRONTEND_RENDER_MODES = ("sync", "thread")
+# Cadence of the background renderer when frontend_mininterval is not set
+DEFAULT_FRONTEND_RENDER_INTERVAL = 0.1
+# Arguments handled by stqdm, that are not passed to tqdm
+STQDM_ONLY_ARGS = frozenset(
+    {
+        "st_container",
+        "backend",
+        "frontend",
+        "frontend_mininterval",
+        "frontend_progress_step",
+        "frontend_render_mode",
+        "frontend_delay",
+        "frontend_group",
+        "sharded_counter",
+        "prefetch",
+        "show_prefetch",
+        "record_latency",
+        "show_latency",
+    }
+)
+# Percentiles of the loop body duration displayed with show_latency=True
+LATENCY_PERCENTILES = (("p50", 50), ("p95", 95), ("p99", 99))
+# Fields that FrontendBarFormat can compute without going through tqdm's generic format_meter
+FAST_FRONTEND_FIELDS = frozenset({"desc", "n", "n_fmt", "total", "total_fmt", "unit", "percentage"})
+
+
+class FrontendBarFormat(NamedTuple):
+    """A bar_format adapted to stqdm's frontend, compiled once by compile_frontend_bar_format.
+
+    Attributes:
+        ncols (Optional[int]): The number of columns used to format the frontend text.
+        bar_format (Optional[str]): The bar_format stripped of the {bar} placeholder.
+        should_display_progress_bar (bool): Whether the streamlit progress bar should be displayed.
+        should_display_text (bool): Whether there is some text to display.
+        fields (Optional[frozenset[str]]): Names of the fields referenced by bar_format, None for tqdm's default format.
+    """
+
+    ncols: Optional[int]
+    bar_format: Optional[str]
+    should_display_progress_bar: bool
+    should_display_text: bool
+    fields: Optional[frozenset[str]]
+
+    def format_text(self, n: float, total: Optional[float], **kwargs) -> Optional[str]:
+        """Formats the text by computing only the fields referenced by bar_format.
+
+        This mirrors tqdm.format_meter for simple formats (see FAST_FRONTEND_FIELDS).
+
+        Returns:
+            Optional[str]: The formatted text, or None if tqdm's format_meter is required.
+        """
+        if self.bar_format is None or self.fields is None or not self.fields <= FAST_FRONTEND_FIELDS:
+            return None
+        if kwargs.get("ncols") or kwargs.get("unit_scale"):
+            return None
+        bar_format = self.bar_format
+        prefix = kwargs.get("prefix")
+        if total and (n >= total + 0.5 or total == float("inf")):
+            total = None
+        if total:
+            percentage = n / total * 100
+            if not prefix:
+                bar_format = bar_format.replace("{desc}: ", "")
+        else:
+            percentage = 0
+        values = {
+            "desc": prefix or "",
+            "n": n,
+            "n_fmt": str(n),
+            "total": total,
+            "total_fmt": str(total) if total is not None else "?",
+            "unit": kwargs.get("unit", "it"),
+            "percentage": percentage,
+        }
+        return bar_format.format(**{field: values[field] for field in self.fields})
+
+
+@functools.lru_cache(maxsize=256)
+def compile_frontend_bar_format(bar_format: Optional[str], ncols: Optional[int]) -> FrontendBarFormat:
+    """Compiles a tqdm bar_format for stqdm's frontend. See stqdm.build_frontend_config_overrides.
+
+    The result is cached, so bars sharing the same format only parse it once.
+    """
+    fields: Optional[frozenset[str]] = None
+    if bar_format is None:
+        if ncols is None:
+            ncols = 0
+        should_display_progress_bar = True
+        should_display_text = True
+    elif bar_format == "":
+        should_display_progress_bar = True
+        should_display_text = False
+        fields = frozenset()
+    else:
+        original_bar_format = bar_format
+        # {bar:size} defines the bar + its size (default 10)
+        bar_format = re.sub(BAR_FORMAT_REGEX, "", bar_format)
+        should_display_progress_bar = bar_format != original_bar_format
+        should_display_text = bool(bar_format.strip())
+        fields = _get_format_fields(bar_format)
+    # ncols should not impact text of stqdm's frontend
+    # ncols = 0, forces a specific bar format
+    return FrontendBarFormat(ncols, bar_format, should_display_progress_bar, should_display_text, fields)
+
+
+def has_script_run_context() -> bool:
+    """Returns True if the current thread is running a Streamlit script, i.e. if frontend updates can be displayed."""
+    if "streamlit" not in sys.modules:
+        # No script can be running if streamlit was never imported, no need to import it
+        return False
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def get_script_session_id() -> Optional[str]:
+    """Returns the id of the Streamlit session running the current thread, None outside of a Streamlit script."""
+    if not has_script_run_context():
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    script_run_ctx = get_script_run_ctx(suppress_warning=True)
+    return None if script_run_ctx is None else script_run_ctx.session_id
+
+
+def is_session_active(session_id: str) -> bool:
+    """Returns False if the Streamlit session ended. Sessions are considered active without a Streamlit runtime."""
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return True
+    return Runtime.instance().is_active_session(session_id)
+
+
+@functools.cache
+def is_text_inside_progress_available() -> bool:
+    """Returns True if st.progress accepts a text (streamlit >= 1.18.0)."""
+    import streamlit as st
+
+    major, minor = (int(part) for part in re.findall(r"\d+", st.__version__)[:2])
+    return (major, minor) >= (1, 18)
+
+
+def __getattr__(name: str) -> Any:
+    # IS_TEXT_INSIDE_PROGRESS_AVAILABLE is computed on first access to avoid importing streamlit with stqdm
+    if name == "IS_TEXT_INSIDE_PROGRESS_AVAILABLE":
+        return is_text_inside_progress_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_format_fields(format_string: str) -> Optional[frozenset[str]]:
+    try:
+        parsed = list(string.Formatter().parse(format_string))
+    except ValueError:
+        # Let tqdm report malformed formats
+        return None
+    return frozenset(re.split(r"[.\[]", field_name, maxsplit=1)[0] for _, field_name, _, _ in parsed if field_name is not None)
 
 
 class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
@@ -27,8 +204,35 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
 
     Attributes:
         st_container (DeltaGenerator): The Streamlit container for displaying progress bar.
+            Created on first use if not provided, so that headless bars never create Streamlit elements.
         _backend (bool): Flag to enable or disable backend progress display. Backend is server log.
         _frontend (bool): Flag to enable or disable frontend progress display. Frontend is Streamlit interface.
+        _frontend_mininterval (float): Minimum time in seconds between two Streamlit updates of this bar.
+            Refreshes in between are coalesced, and the latest state is always rendered when the bar closes.
+        _frontend_progress_step (float): Progress quantization used to decide if the progress bar changed visibly.
+            Streamlit is only called when the quantized progress or the text differs from the last rendered frame.
+        _sharded_counter (Optional[ShardedCounter]): Set with sharded_counter=True. update() only adds to a
+            per-thread slot, slots are merged into n at most every mininterval, by the renderer thread and on close.
+            With a frontend, it implies frontend_render_mode="thread", and threads without ScriptRunContext never merge.
+        _frontend_render_mode (str): "sync" renders in the iterating thread during refresh.
+            "thread" only flags the bar as changed, a renderer thread attached to the ScriptRunContext pushes
+            the latest state every frontend_mininterval (or DEFAULT_FRONTEND_RENDER_INTERVAL) seconds.
+        _prefetcher (Optional[PrefetchIterator]): Set with prefetch=N. A background thread reads the iterable
+            up to N items ahead while the loop body runs. With show_prefetch=True, the frontend displays
+            the buffer fill level: an empty buffer means the source is the bottleneck, a full one the loop body.
+        render_stats (RenderStats): Counters of the rendering work of this bar: st_display calls, Streamlit deltas,
+            payload bytes, frontend and backend display time, and loop body time once closed.
+            They are also added to the counters of all the bars, see stqdm.stats().
+        latency (Optional[LatencyHistogram]): Set with record_latency=True. The duration of the loop body
+            of each iteration, see LatencyHistogram.summary() for p50, p95, p99 and max.
+            With show_latency=True, the frontend also displays these percentiles.
+        _trace_recorder (Optional[TraceRecorder]): The recorder started when the bar was created, if any.
+            It records the span of the bar, its first render and its counter at each frontend update.
+        _frontend_delay (float): Set with frontend_delay=seconds. Until the bar has run that long, it does not render
+            nor create any Streamlit element, so that short-lived bars cost nothing in the frontend.
+            Past the threshold, the bar renders from its current state, at the position of the page reached by then.
+        _frontend_group (Optional[stqdm_group]): Set with frontend_group=group. The bar has no Streamlit element
+            of its own, its frontend updates are rendered by the group together with the other bars of the group.
     """
 
     def __init__(
@@ -41,41 +245,162 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
         Args:
             iterable (Optional[Iterable]): The iterable to wrap with the progress bar.
             **kwargs (Unpack[STQDMArgs]): Additional keyword arguments coming either from tqdm or from stqdm.
-                stqdm arguments are st_container, backend, frontend.
-        """
-        merged_kwargs = self.combine_default_and_provided_kwargs(provided_config=kwargs)
+                stqdm arguments are st_container, backend, frontend and the frontend_* options.
 
-        self.st_container: "DeltaGenerator" = merged_kwargs.pop("st_container", st.container())
-        self._backend: bool = merged_kwargs.pop("backend", False)
-        self._frontend: bool = merged_kwargs.pop("frontend", True)
+        Raises:
+            ValueError: If frontend_render_mode is not one of frontend_render_modes.
+        """
+        config = self.combine_default_and_provided_kwargs(provided_config=kwargs)
+        # The merged config is read-only, stqdm's own arguments are read from it and the others are passed to tqdm
+        tqdm_kwargs: dict[str, Any] = {key: value for key, value in config.items() if key not in STQDM_ONLY_ARGS}
+
+        self._st_container: Optional["DeltaGenerator"] = config.get("st_container", None)
+        self._backend: bool = config.get("backend", False)
+        self._frontend_group: Optional["stqdm_group"] = config.get("frontend_group", None)
+        # Without a script run context (plain python, batch jobs, worker threads), nothing can reach a browser,
+        # unless the bar belongs to a group created by a script: the group renders it from that script
+        self._frontend: bool = config.get("frontend", True) and (
+            has_script_run_context() or (self._frontend_group is not None and self._frontend_group.created_by_script)
+        )
+        self._frontend_delay: float = config.get("frontend_delay", 0.0)
+        # Whether the bar is still under frontend_delay, see _is_frontend_delayed
+        self._frontend_delayed: bool = self._frontend_delay > 0
+        if self._frontend and self._st_container is None and self._frontend_group is None and not self._frontend_delayed:
+            import streamlit as st
+
+            # Reserve the bar's position in the page at construction
+            self._st_container = st.container()
+        self._frontend_mininterval: float = config.get("frontend_mininterval", 0.0)
+        self._frontend_progress_step: float = config.get("frontend_progress_step", DEFAULT_FRONTEND_PROGRESS_STEP)
+        self._frontend_render_mode: str = config.get("frontend_render_mode", "sync")
+        if self._frontend_render_mode not in self.frontend_render_modes:
+            raise ValueError(
+                f"frontend_render_mode should be one of {self.frontend_render_modes}, got {self._frontend_render_mode!r}."
+            )
+        if self._frontend and config.get("sharded_counter", False):
+            # The threads updating a sharded counter have no ScriptRunContext, the renderer thread merges and renders
+            self._frontend_render_mode = "thread"
         if not self._backend:
             # Route tqdm's terminal writes to an in-memory sink so close() cannot leak a trailing newline.
-            merged_kwargs["file"] = io.StringIO()
+            tqdm_kwargs["file"] = io.StringIO()
 
         # Will be set when necessary
         self._st_progress_bar: Optional["DeltaGenerator"] = None
         self._st_text: Optional["DeltaGenerator"] = None
-        frontend_config = self.build_frontend_config_overrides(**merged_kwargs)
-        self._frontend_ncols: Optional[int] = frontend_config["ncols"]
-        self._frontend_bar_format: Optional[str] = frontend_config["bar_format"]
-        self.should_display_progress_bar: bool = frontend_config["should_display_progress_bar"]
-        self.should_display_text: bool = frontend_config["should_display_text"]
+        # Placeholders emptied by st_clear, reused if the bar is reset
+        self._cleared_st_progress_bar: Optional["DeltaGenerator"] = None
+        self._cleared_st_text: Optional["DeltaGenerator"] = None
+        self._closed = False
+        self._frontend_last_render_t: float = float("-inf")
+        self._frontend_pending: bool = False
+        self._last_frontend_frame: Optional[tuple[Optional[float], Optional[str]]] = None
+        self._frontend_renderer: Optional[threading.Thread] = None
+        self._frontend_renderer_stop: Optional[threading.Event] = None
+        self._sharded_counter: Optional["ShardedCounter"] = None
+        if config.get("sharded_counter", False):
+            from stqdm.updates import ShardedCounter
+
+            self._sharded_counter = ShardedCounter()
+            self._sharded_merge_lock = threading.Lock()
+        iterable = self._init_prefetch(config, iterable, tqdm_kwargs)
+        self._frontend_template = compile_frontend_bar_format(tqdm_kwargs.get("bar_format"), tqdm_kwargs.get("ncols"))
+        self._frontend_ncols: Optional[int] = self._frontend_template.ncols
+        self._frontend_bar_format: Optional[str] = self._frontend_template.bar_format
+        self.should_display_progress_bar: bool = self._frontend_template.should_display_progress_bar
+        self.should_display_text: bool = self._frontend_template.should_display_text
+
+        # tqdm's __init__ renders the bar a first time
+        self._init_instrumentation(config, tqdm_kwargs.get("desc"))
 
         super().__init__(
             iterable=iterable,
-            **merged_kwargs,
+            **tqdm_kwargs,
+        )
+        if self._frontend and self._frontend_render_mode == "thread" and not self.disable:
+            self._start_frontend_renderer()
+
+    def _init_prefetch(
+        self, config: STQDMArgs, iterable: Optional[Iterable[Any] | AsyncIterator[Any]], tqdm_kwargs: dict[str, Any]
+    ) -> Optional[Iterable[Any] | AsyncIterator[Any]]:
+        """Wraps iterable in a PrefetchIterator if prefetch is set, and returns the iterable to pass to tqdm."""
+        self._prefetcher: Optional["PrefetchIterator"] = None
+        self._show_prefetch: bool = config.get("show_prefetch", False)
+        prefetch: int = config.get("prefetch", 0)
+        if not prefetch or iterable is None:
+            return iterable
+        from stqdm.prefetch import PrefetchIterator
+
+        if tqdm_kwargs.get("total") is None and hasattr(iterable, "__len__"):
+            # The prefetching iterator has no length, tqdm could not infer the total from it
+            tqdm_kwargs["total"] = len(cast(Any, iterable))
+        self._prefetcher = PrefetchIterator(cast(Iterable[Any], iterable), prefetch)
+        return self._prefetcher
+
+    def _init_instrumentation(self, config: STQDMArgs, desc: Optional[str]) -> None:
+        """Sets up the rendering counters, the latency histogram and the trace of the bar."""
+        # The renderer thread and the threads updating a sharded counter record concurrently with the loop
+        self.render_stats = RenderStats(
+            parent=global_render_stats,
+            thread_safe=self._frontend_render_mode == "thread" or self._sharded_counter is not None,
         )
+        self._created_perf_t = time.perf_counter()
+        self._show_latency: bool = config.get("show_latency", False)
+        self.latency: Optional[LatencyHistogram] = None
+        if config.get("record_latency", False) or self._show_latency:
+            self.latency = LatencyHistogram()
+        self._trace_recorder = get_active_recorder()
+        if self._trace_recorder is not None:
+            self._trace_recorder.bar_started(self, desc, self._created_perf_t)
+
+    # Set by tqdm's __init__, missing from tqdm's type stubs
+    _time: Callable[[], float]
+
+    # Subclasses can support more render modes
+    frontend_render_modes: tuple[str, ...] = FRONTEND_RENDER_MODES
 
     ####
     # STQDM's default arguments handling with the scope manager
     ###
-    scope_stack: ScopeManager[STQDMArgs] = ScopeManager(STQDMArgs())
+    scope_stack: ScopeManager[STQDMArgs] = ScopeManager(
+        STQDMArgs(), get_session_id=get_script_session_id, is_session_active=is_session_active
+    )
 
     @classmethod
     def set_default_config(cls, /, **config: Unpack[STQDMArgs]) -> None:
         """Sets the default configuration for stqdm instances globally."""
         cls.scope_stack.set_default_config(config)
 
+    @classmethod
+    def set_session_default_config(cls, /, **config: Unpack[STQDMArgs]) -> None:
+        """Sets the default configuration for stqdm instances of the current Streamlit session.
+
+        It overrides the global default configuration, see set_default_config, in this session only.
+        The defaults of ended sessions are dropped the next time a session default configuration is set or cleared.
+
+        Raises:
+            RuntimeError: If called outside of a Streamlit script.
+        """
+        cls.scope_stack.set_session_default_config(config)
+
+    @classmethod
+    def clear_session_default_config(cls) -> None:
+        """Removes the default configuration of the current Streamlit session, see set_session_default_config."""
+        cls.scope_stack.clear_session_default_config()
+
+    @staticmethod
+    def stats() -> RenderStats:
+        """Returns the rendering counters of all the bars of the process, see RenderStats.
+
+        The counters of a single bar are in its render_stats attribute.
+
+        Examples:
+            >>> stqdm.stats().reset()
+            >>> for _ in stqdm(range(10_000)):
+            ...     pass
+            >>> stqdm.stats().deltas  # Streamlit elements created, updated or emptied by the loop
+        """
+        return global_render_stats
+
     @classmethod
     @contextmanager
     def scope(cls, /, **config: Unpack[STQDMArgs]) -> Generator[STQDMArgs, None, None]:
@@ -126,15 +451,86 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
         """
         return cls.scope_stack.use_current_default_if_config_not_provided(config=provided_config)
 
+    ###
+    # Sharded counter
+    ###
+
+    def __iter__(self) -> Iterator[Any]:
+        iterator = super().__iter__() if self._sharded_counter is None else self._iter_sharded()
+        if self.latency is None:
+            return iterator
+        return self._iter_timed(iterator, self.latency)
+
+    @staticmethod
+    def _iter_timed(iterator: Iterator[Any], histogram: LatencyHistogram) -> Iterator[Any]:
+        # Only the loop body is timed, between yielding an item and being asked for the next one
+        perf_counter = time.perf_counter
+        try:
+            for obj in iterator:
+                start = perf_counter()
+                yield obj
+                histogram.record(perf_counter() - start)
+        finally:
+            cast(Generator[Any, None, None], iterator).close()
+
+    def _iter_sharded(self) -> Iterator[Any]:
+        # tqdm's __iter__ assumes that n is up to date after update(), which is not the case with a sharded counter
+        try:
+            for obj in cast(Iterable[Any], self.iterable):
+                yield obj
+                self.update(1)
+        finally:
+            self.close()
+
+    def update(self, n: Optional[float] = 1) -> Optional[bool]:
+        """Increments the counter, see tqdm.update. With sharded_counter=True, this is safe to call from many threads."""
+        if self._sharded_counter is None:
+            return super().update(n)
+        if self.disable:
+            # As in tqdm.update, disabled bars do not even have a last_print_t
+            return None
+        self._sharded_counter.add(cast(float, n))
+        # Unsynchronized read: at worst one extra merge attempt
+        if self._time() - self.last_print_t < self.mininterval:
+            return None
+        if self._frontend and not has_script_run_context():
+            # Streamlit raises while tqdm holds its write lock, the renderer thread merges for the worker threads
+            return None
+        return self._merge_sharded_counter(blocking=False)
+
+    def _merge_sharded_counter(self, blocking: bool = True) -> Optional[bool]:
+        # Released in the finally clause below, a with statement cannot acquire without blocking
+        if self._sharded_counter is None or not self._sharded_merge_lock.acquire(blocking):  # pylint: disable=consider-using-with
+            return None
+        try:
+            delta = self._sharded_counter.collect()
+            return super().update(delta) if delta else None
+        finally:
+            self._sharded_merge_lock.release()
+
     ###
     # Internal Functions
     ###
 
+    @property
+    def st_container(self) -> "DeltaGenerator":
+        """Returns the Streamlit container of the bar, creating it on first use."""
+        if self._st_container is None:
+            import streamlit as st
+
+            self._st_container = st.container()
+        return self._st_container
+
+    @st_container.setter
+    def st_container(self, st_container: "DeltaGenerator") -> None:
+        self._st_container = st_container
+
     @property
     def st_progress_bar(self) -> "DeltaGenerator":
         """Lazily creates and returns a Streamlit container for the frontend progress bar."""
         if self._st_progress_bar is None:
             self._st_progress_bar = self.st_container.empty()
+            self.render_stats.record(deltas=1)
         return self._st_progress_bar
 
     @property
@@ -145,6 +541,7 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
         """
         if self._st_text is None:
             self._st_text = self.st_container.empty()
+            self.render_stats.record(deltas=1)
         return self._st_text
 
     def st_display(self, n: float, total: Optional[float], **kwargs) -> None:  # pylint: disable=invalid-name
@@ -154,21 +551,28 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
         Text is displayable if format allows it. IE: if the text is not empty. Typically bar_format={bar}.
         Since version 1.18.0 of streamlit, the text will be displayed together within the progress bar widget.
         Before, it required 2 components (a progress bar, and a text above).
+        Nothing is sent to streamlit if the quantized progress and the text are the same as in the last frame.
         """
-        if self.should_display_text:
-            # cast to float because of issue with tqdm stubs typing
-            meter_text = self.format_meter(n, cast(float, total), **kwargs)
-        else:
-            meter_text = None
+        progress, meter_text = self.format_frontend(n, total, **kwargs)
+        can_display_text = meter_text is not None
 
-        can_display_text = bool(meter_text)
-        can_display_progress_bar = total is not None and total > 0
+        frame = (self._quantize_progress(progress), meter_text)
+        if frame == self._last_frontend_frame:
+            self.render_stats.record(st_display_calls=1)
+            return
+        self._last_frontend_frame = frame
+        separate_text = can_display_text and (progress is None or not is_text_inside_progress_available())
+        self.render_stats.record(
+            st_display_calls=1,
+            deltas=(progress is not None) + separate_text,
+            payload_bytes=(PROGRESS_PAYLOAD_BYTES if progress is not None else 0)
+            + (len(cast(str, meter_text).encode()) if can_display_text else 0),
+        )
 
-        if can_display_progress_bar and self.should_display_progress_bar:
-            progress = min(max(n / total, 0.0), 1.0)
+        if progress is not None:
             if not can_display_text:
                 self.st_progress_bar.progress(progress)
-            elif IS_TEXT_INSIDE_PROGRESS_AVAILABLE:
+            elif is_text_inside_progress_available():
                 self.st_progress_bar.progress(progress, text=meter_text)
             else:
                 self.st_text.write(meter_text)
@@ -177,6 +581,31 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
             if can_display_text:
                 self.st_text.write(meter_text)
 
+    def format_frontend(self, n: float, total: Optional[float], **kwargs) -> tuple[Optional[float], Optional[str]]:
+        """Computes what the frontend displays, see st_display.
+
+        Returns:
+            tuple[Optional[float], Optional[str]]: The progress between 0 and 1, None if the progress bar is not
+                displayable, and the text, None if there is no text to display.
+        """
+        if self.should_display_text:
+            meter_text = self._frontend_template.format_text(n, total, **kwargs)
+            if meter_text is None:
+                # cast to float because of issue with tqdm stubs typing
+                meter_text = self.format_meter(n, cast(float, total), **kwargs)
+        else:
+            meter_text = None
+
+        can_display_progress_bar = total is not None and total > 0 and self.should_display_progress_bar
+        progress = min(max(n / cast(float, total), 0.0), 1.0) if can_display_progress_bar else None
+        return progress, meter_text or None
+
+    def _quantize_progress(self, progress: Optional[float]) -> Optional[float]:
+        if progress is None or not self._frontend_progress_step:
+            return progress
+        # The epsilon absorbs float errors such as 0.029 / 0.001 == 28.999999999999996
+        return int(progress / self._frontend_progress_step + 1e-9)
+
     def display(self, msg: str | None = None, pos: int | None = None) -> Any:
         """Overrides the tqdm display method to include frontend and backend logic.
 
@@ -184,34 +613,201 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
         Backend refers to streamlit server logs.
         """
         if self._backend:
+            start = time.perf_counter()
             super().display(msg, pos)
+            self.render_stats.record(backend_time=time.perf_counter() - start)
         if self._frontend:
-            self.st_display(**self.frontend_format_dict)
+            if self._is_frontend_delayed():
+                self._frontend_pending = True
+            else:
+                self._request_frontend_render()
+        elif self._trace_recorder is not None:
+            self._trace_recorder.bar_sampled(self)
         return True
 
+    def _is_frontend_delayed(self) -> bool:
+        if not self._frontend_delayed:
+            return False
+        # start_t is not set yet during tqdm's __init__
+        start_t = getattr(self, "start_t", None)
+        if start_t is None or self._time() - start_t < self._frontend_delay:
+            return True
+        self._frontend_delayed = False
+        return False
+
+    def _request_frontend_render(self) -> None:
+        """Render the frontend now, or defer it if the last render is more recent than frontend_mininterval."""
+        if self._frontend_render_mode == "thread":
+            # The renderer thread will pick it up
+            self._frontend_pending = True
+            return
+        if self._time() - self._frontend_last_render_t < self._frontend_mininterval:
+            self._frontend_pending = True
+            return
+        self._render_frontend()
+
+    def _render_frontend(self) -> None:
+        self._frontend_pending = False
+        self._frontend_last_render_t = self._time()
+        start = time.perf_counter()
+        if self._frontend_group is not None:
+            self._frontend_group.request_render(self)
+        else:
+            self.st_display(**self.frontend_format_dict)
+        self.render_stats.record(frontend_time=time.perf_counter() - start)
+        if self._trace_recorder is not None:
+            self._trace_recorder.bar_rendered(self)
+
+    def _flush_frontend(self) -> None:
+        """Render the latest deferred frontend state, if any (trailing edge of the rate limit)."""
+        if self._frontend_pending and not self._is_frontend_delayed():
+            self._render_frontend()
+
+    def _start_frontend_renderer(self) -> None:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+        interval = self._frontend_mininterval or DEFAULT_FRONTEND_RENDER_INTERVAL
+        self._frontend_renderer_stop = threading.Event()
+        # The thread only keeps a weak reference so that an unclosed bar can still be garbage collected
+        self._frontend_renderer = threading.Thread(
+            target=self._run_frontend_renderer,
+            args=(weakref.ref(self), self._frontend_renderer_stop, interval),
+            name="stqdm-frontend-renderer",
+            daemon=True,
+        )
+        add_script_run_ctx(self._frontend_renderer)
+        self._frontend_renderer.start()
+
+    @staticmethod
+    def _run_frontend_renderer(bar_ref: "weakref.ref[stqdm]", stop: threading.Event, interval: float) -> None:
+        while not stop.wait(interval):
+            progress_bar = bar_ref()
+            if progress_bar is None:
+                return
+            progress_bar._merge_sharded_counter()  # pylint: disable=protected-access
+            progress_bar._flush_frontend()  # pylint: disable=protected-access
+            del progress_bar
+
+    def _stop_frontend_renderer(self) -> None:
+        if self._frontend_renderer is None or self._frontend_renderer_stop is None:
+            return
+        self._frontend_renderer_stop.set()
+        if self._frontend_renderer is not threading.current_thread():
+            self._frontend_renderer.join()
+
+    @property
+    def _frontend_leave(self) -> bool:
+        return self.pos == 0 if self.leave is None else self.leave
+
     def st_clear(self) -> None:
         """Clear the streamlit frontend part if necessary. This is used in .close()."""
-        leave = self.pos == 0 if self.leave is None else self.leave
-        if leave:
+        if self._frontend_leave:
             return
+        if self._frontend_group is not None:
+            self._frontend_group.discard(self)
+        self._last_frontend_frame = None
         if self._st_text is not None:
             self._st_text.empty()
+            self.render_stats.record(deltas=1)
+            self._cleared_st_text = self._st_text
             self._st_text = None
         if self._st_progress_bar is not None:
             self._st_progress_bar.empty()
+            self.render_stats.record(deltas=1)
+            self._cleared_st_progress_bar = self._st_progress_bar
             self._st_progress_bar = None
 
+    def reset(self, total: Optional[float] = None, iterable: Optional[Iterable[Any]] = None) -> None:
+        """Resets the bar to 0 for repeated use, see tqdm.reset.
+
+        A closed bar is reopened and renders in the same Streamlit elements, even if st_clear emptied them.
+        A recurring inner loop can then reuse one bar instead of creating and clearing elements at each outer iteration.
+
+        Examples:
+            >>> inner_bar = stqdm(leave=False)
+            ... for batch in stqdm(batches):
+            ...     inner_bar.reset(iterable=batch)
+            ...     for row in inner_bar:
+            ...         process(row)
+
+        Args:
+            total (Optional[float]): The new total. Defaults to the length of iterable, if any.
+            iterable (Optional[Iterable]): A new iterable to wrap.
+        """
+        if iterable is not None:
+            if total is None and hasattr(iterable, "__len__"):
+                total = len(cast(Any, iterable))
+            if self._prefetcher is not None:
+                from stqdm.prefetch import PrefetchIterator
+
+                self._prefetcher.close()
+                iterable = self._prefetcher = PrefetchIterator(iterable, self._prefetcher.size)
+            self.iterable = iterable
+        if self._sharded_counter is not None:
+            from stqdm.updates import ShardedCounter
+
+            self._sharded_counter = ShardedCounter()
+        if self.latency is not None:
+            self.latency.reset()
+        if self._closed:
+            self._reopen()
+        super().reset(total)
+
+    def _reopen(self) -> None:
+        self._closed = False
+        self.disable = False
+        # tqdm's registry of bars and positions, as in tqdm's __init__, is missing from its type stubs
+        with self._lock:  # type: ignore[attr-defined]
+            if self.pos >= 0:
+                # Not a fixed position, the previous one may have been taken
+                self.pos = self._get_free_pos(self)  # type: ignore[attr-defined]
+            self._instances.add(self)  # type: ignore[attr-defined]
+        if self._st_progress_bar is None:
+            self._st_progress_bar = self._cleared_st_progress_bar
+        if self._st_text is None:
+            self._st_text = self._cleared_st_text
+        self._cleared_st_progress_bar = self._cleared_st_text = None
+        self._frontend_pending = False
+        if self._trace_recorder is not None:
+            self._trace_recorder.bar_started(self, self.desc)
+        if self._frontend and self._frontend_render_mode == "thread":
+            self._start_frontend_renderer()
+
     def close(self) -> None:
         """Close the progress bar."""
-        if self.disable:
+        if getattr(self, "disable", True):
             # TQDM internal to avoid multiple closing
             return
+        self._closed = True
+        self._stop_frontend_renderer()
+        self._merge_sharded_counter()
+        if self._prefetcher is not None:
+            self._prefetcher.close()
         super().close()
+        self.render_stats.record(elapsed=time.perf_counter() - self._created_perf_t, bars=1)
+        if self._trace_recorder is not None:
+            self._trace_recorder.bar_closed(self)
+        if self._frontend_leave:
+            self._flush_frontend()
         self.st_clear()
+        if self._frontend and self._frontend_group is not None:
+            self._frontend_group.bar_closed(self)
 
     @property
     def frontend_format_dict(self) -> dict[str, Any]:
-        return {**self.format_dict, "ncols": self._frontend_ncols, "bar_format": self._frontend_bar_format}
+        format_dict = {**self.format_dict, "ncols": self._frontend_ncols, "bar_format": self._frontend_bar_format}
+        if self._show_prefetch and self._prefetcher is not None:
+            prefetch_postfix = f"prefetch={self._prefetcher.buffered}/{self._prefetcher.size}"
+            postfix = format_dict.get("postfix")
+            format_dict["postfix"] = f"{postfix}, {prefetch_postfix}" if postfix else prefetch_postfix
+        if self._show_latency and self.latency is not None and self.latency.count:
+            latency_postfix = ", ".join(
+                f"{name}={format_duration(self.latency.percentile(percent))}" for name, percent in LATENCY_PERCENTILES
+            )
+            latency_postfix += f", max={format_duration(self.latency.max)}"
+            postfix = format_dict.get("postfix")
+            format_dict["postfix"] = f"{postfix}, {latency_postfix}" if postfix else latency_postfix
+        return format_dict
 
     @staticmethod
     def build_frontend_config_overrides(**kwargs) -> dict[str, Any]:
@@ -224,6 +820,7 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
         For this reason, we analyze the bar_format to understand if there is a {bar:something} inside and remove it.
         If we find a progress bar inside, new_bar_format != bar_format, then we will display the progress bar if possible.
         If after removing the progress bar, the bar_format is empty, then there is no text to display and we don't.
+        The analysis is cached per (bar_format, ncols), see compile_frontend_bar_format.
 
         Args:
             **kwargs: Arbitrary keyword arguments.
@@ -240,29 +837,12 @@ class stqdm(tqdm):  # pylint: disable=invalid-name,inconsistent-mro
                 - should_display_progress_bar (bool): Indicates whether the progress bar should be displayed.
                 - should_display_text (bool): Indicates whether text should be displayed alongside or instead of the bar.
         """
-        bar_format: Optional[str] = kwargs.get("bar_format")
-        ncols: Optional[int] = kwargs.get("ncols")
-        if bar_format is None:
-            if ncols is None:
-                ncols = 0
-            should_display_progress_bar = True
-            should_display_text = True
-        elif bar_format == "":
-            should_display_progress_bar = True
-            should_display_text = False
-        else:
-            original_bar_format = bar_format
-            # {bar:size} defines the bar + its size (default 10)
-            bar_format = re.sub(BAR_FORMAT_REGEX, "", bar_format)
-            should_display_progress_bar = bar_format != original_bar_format
-            should_display_text = bool(bar_format.strip())
+        frontend_bar_format = compile_frontend_bar_format(kwargs.get("bar_format"), kwargs.get("ncols"))
         return {
-            # ncols should not impact text of stqdm's frontend
-            # ncols = 0, forces a specific bar format
-            "ncols": ncols,
-            "bar_format": bar_format,
-            "should_display_progress_bar": should_display_progress_bar,
-            "should_display_text": should_display_text,
+            "ncols": frontend_bar_format.ncols,
+            "bar_format": frontend_bar_format.bar_format,
+            "should_display_progress_bar": frontend_bar_format.should_display_progress_bar,
+            "should_display_text": frontend_bar_format.should_display_text,
         }
 
     @staticmethod
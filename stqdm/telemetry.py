@@ -0,0 +1,227 @@
+"""Counters measuring the cost of rendering progress bars."""
+
+from __future__ import annotations
+
+import math
+import threading
+from contextlib import nullcontext
+from typing import Optional
+
+__all__ = ["LatencyHistogram", "RenderStats", "global_render_stats"]
+
+# Approximate size of a progress value in a Streamlit delta, on top of its text
+PROGRESS_PAYLOAD_BYTES = 8
+
+
+class RenderStats:
+    """Rendering counters of a progress bar, or of all the bars of the process (see stqdm.stats()).
+
+    Recording is a few additions per render, cheap enough to stay enabled in production.
+    Counters recorded on a bar are also added to its parent, the process-wide counters.
+    The process-wide counters are always locked, the counters of a bar only if it records from many threads.
+
+    Attributes:
+        st_display_calls (int): Number of calls to st_display, including frames skipped because nothing changed.
+        deltas (int): Number of Streamlit elements created, updated or emptied.
+        payload_bytes (int): Approximate size of the data sent to Streamlit: texts, and progress values.
+        frontend_time (float): Time in seconds spent formatting and sending frontend updates.
+        backend_time (float): Time in seconds spent writing the bar to the terminal (backend).
+        elapsed (float): Lifetime in seconds of the closed bars.
+        bars (int): Number of closed bars.
+    """
+
+    __slots__ = (
+        "st_display_calls",
+        "deltas",
+        "payload_bytes",
+        "frontend_time",
+        "backend_time",
+        "elapsed",
+        "bars",
+        "_parent",
+        "_lock",
+    )
+
+    def __init__(self, parent: Optional["RenderStats"] = None, thread_safe: bool = False) -> None:
+        """Initializes the counters to 0.
+
+        Args:
+            parent (Optional[RenderStats]): Counters also receiving everything recorded here.
+            thread_safe (bool): Whether records can come from many threads, for example from the renderer thread
+                of a bar with frontend_render_mode="thread" while the iterating thread records backend time.
+                Counters without parent, shared by all the bars, are always thread-safe.
+        """
+        self._parent = parent
+        self._lock: Optional[threading.Lock] = threading.Lock() if parent is None or thread_safe else None
+        self._clear()
+
+    def _clear(self) -> None:  # pylint: disable=attribute-defined-outside-init
+        self.st_display_calls = 0
+        self.deltas = 0
+        self.payload_bytes = 0
+        self.frontend_time = 0.0
+        self.backend_time = 0.0
+        self.elapsed = 0.0
+        self.bars = 0
+
+    @property
+    def loop_time(self) -> float:
+        """Time in seconds spent outside of rendering during the lifetime of closed bars: the wrapped loop body.
+
+        With frontend_render_mode="thread", frontend_time is spent by the renderer thread, in parallel with the loop,
+        but it is still subtracted: loop_time is then a lower bound of the time spent in the loop body.
+        """
+        return max(self.elapsed - self.frontend_time - self.backend_time, 0.0)
+
+    def record(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        st_display_calls: int = 0,
+        deltas: int = 0,
+        payload_bytes: int = 0,
+        frontend_time: float = 0.0,
+        backend_time: float = 0.0,
+        elapsed: float = 0.0,
+        bars: int = 0,
+    ) -> None:
+        """Adds to the counters, and to the counters of the parent."""
+        with self._lock or nullcontext():
+            self.st_display_calls += st_display_calls
+            self.deltas += deltas
+            self.payload_bytes += payload_bytes
+            self.frontend_time += frontend_time
+            self.backend_time += backend_time
+            self.elapsed += elapsed
+            self.bars += bars
+        if self._parent is not None:
+            self._parent.record(
+                st_display_calls=st_display_calls,
+                deltas=deltas,
+                payload_bytes=payload_bytes,
+                frontend_time=frontend_time,
+                backend_time=backend_time,
+                elapsed=elapsed,
+                bars=bars,
+            )
+
+    def as_dict(self) -> dict[str, float]:
+        """Returns the counters, and loop_time, as a dict."""
+        return {
+            "st_display_calls": self.st_display_calls,
+            "deltas": self.deltas,
+            "payload_bytes": self.payload_bytes,
+            "frontend_time": self.frontend_time,
+            "backend_time": self.backend_time,
+            "loop_time": self.loop_time,
+            "elapsed": self.elapsed,
+            "bars": self.bars,
+        }
+
+    def reset(self) -> None:
+        """Sets all the counters back to 0."""
+        with self._lock or nullcontext():
+            self._clear()
+
+    def __repr__(self) -> str:
+        counters = ", ".join(f"{name}={value!r}" for name, value in self.as_dict().items())
+        return f"{type(self).__name__}({counters})"
+
+
+class LatencyHistogram:
+    """A fixed-memory histogram of durations, with logarithmic buckets.
+
+    Bucket bounds grow by a factor of 2 ** (1 / sub_buckets). With the defaults, the 336 buckets cover
+    durations from 1µs to about 50 days, and percentiles are within 9% of the exact value.
+    The minimum, the maximum and the mean are exact. This is used by stqdm(record_latency=True).
+
+    Attributes:
+        min_duration (float): Upper bound in seconds of the first bucket. Shorter durations are counted in it.
+        sub_buckets (int): Number of buckets per doubling of the duration.
+        count (int): Number of recorded durations.
+        total (float): Sum in seconds of the recorded durations.
+        min (float): Shortest recorded duration, inf if none.
+        max (float): Longest recorded duration, 0 if none.
+    """
+
+    __slots__ = ("min_duration", "sub_buckets", "count", "total", "min", "max", "_counts")
+
+    def __init__(self, min_duration: float = 1e-6, doublings: int = 42, sub_buckets: int = 8) -> None:
+        self.min_duration = min_duration
+        self.sub_buckets = sub_buckets
+        self._counts = [0] * (doublings * sub_buckets)
+        self._clear()
+
+    def _clear(self) -> None:  # pylint: disable=attribute-defined-outside-init
+        self._counts[:] = [0] * len(self._counts)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, duration: float) -> None:
+        """Adds a duration in seconds to the histogram."""
+        if duration > self.min_duration:
+            index = min(int(math.log2(duration / self.min_duration) * self.sub_buckets), len(self._counts) - 1)
+        else:
+            index = 0
+        self._counts[index] += 1
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+
+    def percentile(self, percent: float) -> float:
+        """Returns the duration in seconds under which `percent`% of the recorded durations are, 0 if none.
+
+        The result is the upper bound of the bucket of that rank, capped by the exact min and max.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * percent / 100), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index == len(self._counts) - 1:
+                    # The last bucket also counts all the longer durations
+                    return self.max
+                upper_bound = self.min_duration * 2 ** ((index + 1) / self.sub_buckets)
+                return min(max(upper_bound, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Mean of the recorded durations in seconds, 0 if none."""
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> dict[str, float]:
+        """Returns count, mean, p50, p95, p99 and max, durations in seconds."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+    def reset(self) -> None:
+        """Removes all the recorded durations."""
+        self._clear()
+
+    def __repr__(self) -> str:
+        summary = ", ".join(f"{name}={value!r}" for name, value in self.summary().items())
+        return f"{type(self).__name__}({summary})"
+
+
+def format_duration(seconds: float) -> str:
+    """Formats a short duration with a unit suited to its magnitude: 850µs, 12.3ms or 1.52s."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+# Counters of all the bars of the process
+global_render_stats = RenderStats()
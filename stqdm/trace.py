@@ -0,0 +1,268 @@
+"""Record the timeline of progress bars as a Chrome trace, viewable in Perfetto or chrome://tracing."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from itertools import count
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from stqdm.stqdm import stqdm
+
+__all__ = ["TraceRecorder", "get_active_recorder"]
+
+# Default maximum number of events kept in memory, older events are dropped first
+DEFAULT_TRACE_MAX_EVENTS = 100_000
+
+_active_recorder: Optional["TraceRecorder"] = None  # pylint: disable=invalid-name
+
+
+def get_active_recorder() -> Optional["TraceRecorder"]:
+    """Returns the started TraceRecorder, if any. Bars created while it is started record their timeline in it."""
+    return _active_recorder
+
+
+class _Span(NamedTuple):
+    bar_id: int
+    name: str
+    tid: int
+    start: float
+
+
+def _current_track() -> tuple[object, str]:
+    """Returns the owner and the name of the timeline track of the caller: its asyncio task, or else its thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return task, f"asyncio task {task.get_name()}"
+    thread = threading.current_thread()
+    return thread, thread.name
+
+
+class TraceRecorder:
+    """Records the lifecycle and the progress of stqdm bars, and writes them as a Chrome trace-event JSON file.
+
+    While the recorder is started, each bar records:
+    - a span from its construction to its close, on the track of the thread (or asyncio task) that created it,
+      so that nested loops are displayed as nested spans,
+    - a "first render" instant event when the frontend renders it for the first time,
+    - a sample of its counter at each frontend update, or at each refresh for bars without frontend.
+
+    Events are kept in a bounded ring buffer: once max_events is reached, the oldest events are dropped,
+    as well as the names of the tracks no event refers to anymore.
+    The file is written by flush(), when the recorder stops, and at exit if it is still started.
+    Bars of all the Streamlit sessions of the process are recorded, so the end of a session does not flush:
+    start the recorder in the script, as a context manager, to write the file when the script run ends.
+
+    Examples:
+        >>> with TraceRecorder("stqdm-trace.json"):
+        ...     for batch in stqdm(batches, desc="batches"):
+        ...         for row in stqdm(batch, desc="rows"):
+        ...             process(row)
+
+    Attributes:
+        path (str | os.PathLike): The JSON file written by flush().
+        max_events (int): The size of the ring buffer.
+        dropped_events (int): The number of events dropped from the ring buffer.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], max_events: int = DEFAULT_TRACE_MAX_EVENTS) -> None:
+        if max_events < 1:
+            raise ValueError("max_events must be >= 1.")
+        self.path = path
+        self.max_events = max_events
+        self.dropped_events = 0
+        self._events: deque[dict[str, Any]] = deque(maxlen=max_events)
+        # Spans of the bars not closed yet, by id(bar)
+        self._open_spans: dict[int, _Span] = {}
+        self._rendered_bars: set[int] = set()
+        # Track ids by task or thread. Unlike id(task) or thread idents, they are never reused by a later track.
+        self._track_ids: weakref.WeakKeyDictionary[object, int] = weakref.WeakKeyDictionary()
+        self._track_id_counter = count(1)
+        self._track_names: dict[int, str] = {}
+        # Number of buffered events and open spans by track, the name of a track is dropped with its last one
+        self._track_refs: Counter[int] = Counter()
+        self._bar_ids = count(1)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._previous_recorder: Optional[TraceRecorder] = None
+
+    @staticmethod
+    def _now() -> float:
+        # Trace event timestamps are in microseconds
+        return time.perf_counter() * 1e6
+
+    def _append(self, event: dict[str, Any]) -> None:
+        # Called with the lock held
+        if len(self._events) == self.max_events:
+            self.dropped_events += 1
+            self._release_track(self._events[0]["tid"])
+        self._events.append(event)
+        self._track_refs[event["tid"]] += 1
+
+    def _release_track(self, tid: int) -> None:
+        self._track_refs[tid] -= 1
+        if not self._track_refs[tid]:
+            del self._track_refs[tid]
+            del self._track_names[tid]
+
+    def _current_track_id(self) -> int:
+        # Called with the lock held
+        owner, name = _current_track()
+        tid = self._track_ids.get(owner)
+        if tid is None:
+            tid = self._track_ids[owner] = next(self._track_id_counter)
+        self._track_names[tid] = name
+        return tid
+
+    @property
+    def events(self) -> list[dict[str, Any]]:
+        """The recorded events, then the spans of the bars still open, ending now, as trace events."""
+        now = self._now()
+        with self._lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self._track_names.items()
+            ]
+            open_spans = [self._span_event(span, now, closed=False) for span in self._open_spans.values()]
+            return metadata + list(self._events) + open_spans
+
+    def _span_event(self, span: _Span, end: float, **args: Any) -> dict[str, Any]:
+        return {
+            "name": span.name,
+            "cat": "stqdm",
+            "ph": "X",
+            "ts": span.start,
+            "dur": end - span.start,
+            "pid": self._pid,
+            "tid": span.tid,
+            "args": {"id": span.bar_id, **args},
+        }
+
+    def bar_started(self, progress_bar: "stqdm", desc: Optional[str] = None, start: Optional[float] = None) -> None:
+        """Opens the span of a bar. Called by the bar when constructed, or reopened by reset().
+
+        Args:
+            progress_bar (stqdm): The bar.
+            desc (Optional[str]): The description of the bar, naming its span.
+            start (Optional[float]): The time.perf_counter() of its construction. Defaults to now.
+        """
+        start = self._now() if start is None else start * 1e6
+        with self._lock:
+            span = _Span(
+                bar_id=next(self._bar_ids),
+                name=(desc or "").rstrip(": ") or "stqdm",
+                tid=self._current_track_id(),
+                start=start,
+            )
+            previous_span = self._open_spans.pop(id(progress_bar), None)
+            self._open_spans[id(progress_bar)] = span
+            self._track_refs[span.tid] += 1
+            if previous_span is not None:
+                self._release_track(previous_span.tid)
+            self._rendered_bars.discard(id(progress_bar))
+
+    def bar_rendered(self, progress_bar: "stqdm") -> None:
+        """Records a frontend update of a bar, and its first render."""
+        with self._lock:
+            span = self._open_spans.get(id(progress_bar))
+            if span is None:
+                return
+            if id(progress_bar) not in self._rendered_bars:
+                self._rendered_bars.add(id(progress_bar))
+                self._append(
+                    {
+                        "name": "first render",
+                        "cat": "stqdm",
+                        "ph": "i",
+                        "s": "t",
+                        "ts": self._now(),
+                        "pid": self._pid,
+                        "tid": span.tid,
+                        "args": {"id": span.bar_id, "bar": span.name},
+                    }
+                )
+            self._append_sample(progress_bar, span)
+
+    def bar_sampled(self, progress_bar: "stqdm") -> None:
+        """Records the counter of a bar."""
+        with self._lock:
+            span = self._open_spans.get(id(progress_bar))
+            if span is not None:
+                self._append_sample(progress_bar, span)
+
+    def _append_sample(self, progress_bar: "stqdm", span: _Span) -> None:
+        self._append(
+            {
+                "name": span.name,
+                "cat": "stqdm",
+                "ph": "C",
+                "id": span.bar_id,
+                "ts": self._now(),
+                "pid": self._pid,
+                "tid": span.tid,
+                "args": {"n": progress_bar.n},
+            }
+        )
+
+    def bar_closed(self, progress_bar: "stqdm") -> None:
+        """Closes the span of a bar."""
+        end = self._now()
+        with self._lock:
+            span = self._open_spans.pop(id(progress_bar), None)
+            self._rendered_bars.discard(id(progress_bar))
+            if span is None:
+                return
+            self._append(
+                self._span_event(
+                    span,
+                    end,
+                    n=progress_bar.n,
+                    total=progress_bar.total,
+                    # tqdm stores fixed positions as negative numbers
+                    position=abs(progress_bar.pos),
+                )
+            )
+            # The span event now refers to the track instead of the open span
+            self._release_track(span.tid)
+
+    def flush(self) -> None:
+        """Writes the recorded events to path, replacing the file."""
+        trace = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": self.dropped_events},
+        }
+        with open(self.path, "w", encoding="utf-8") as trace_file:
+            json.dump(trace, trace_file)
+
+    def start(self) -> "TraceRecorder":
+        """Starts recording the bars created from now on, until stop(). It replaces the started recorder, if any."""
+        global _active_recorder  # pylint: disable=global-statement
+        self._previous_recorder, _active_recorder = _active_recorder, self
+        atexit.register(self.flush)
+        return self
+
+    def stop(self) -> None:
+        """Stops recording, restores the previously started recorder and writes the file."""
+        global _active_recorder  # pylint: disable=global-statement
+        if _active_recorder is self:
+            _active_recorder = self._previous_recorder
+        self._previous_recorder = None
+        atexit.unregister(self.flush)
+        self.flush()
+
+    def __enter__(self) -> "TraceRecorder":
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
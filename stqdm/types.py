@@ -1,10 +1,12 @@
-from typing import TYPE_CHECKING, Any, Mapping, Optional
+from typing import TYPE_CHECKING, Any, Literal, Mapping, Optional
 
 from typing_extensions import TypedDict
 
 if TYPE_CHECKING:
     from streamlit.delta_generator import DeltaGenerator
 
+    from stqdm.group import stqdm_group
+
 
 class STQDMArgs(TypedDict, total=False):
     desc: Optional[str]
@@ -34,4 +36,14 @@ class STQDMArgs(TypedDict, total=False):
     file: Any
     frontend: bool
     backend: bool
+    frontend_mininterval: float
+    frontend_progress_step: float
+    frontend_delay: float
+    frontend_render_mode: Literal["sync", "thread", "loop"]
+    sharded_counter: bool
+    prefetch: int
+    show_prefetch: bool
+    record_latency: bool
+    show_latency: bool
     st_container: "DeltaGenerator"
+    frontend_group: "stqdm_group"
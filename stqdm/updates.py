@@ -0,0 +1,142 @@
+"""Helpers to update a stqdm bar from many threads without touching Streamlit from those threads."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Future, wait
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from stqdm.stqdm import stqdm
+
+__all__ = ["ProgressUpdateBus", "ShardedCounter"]
+
+
+class ProgressUpdateBus:
+    """A thread-safe channel to post progress updates that the thread owning the bar applies in batches.
+
+    Any thread can `post` increments, postfix or description changes: posting is a lock-free append.
+    The thread owning the bar (typically the Streamlit script thread) calls `drain` to apply
+    everything posted so far with a single render.
+
+    Examples:
+        >>> with stqdm(total=len(urls)) as progress_bar, ThreadPoolExecutor(32) as executor:
+        ...     bus = ProgressUpdateBus(progress_bar)
+        ...     futures = [executor.submit(fetch, url, on_done=bus.post) for url in urls]
+        ...     bus.drain_until(futures)
+
+    Attributes:
+        progress_bar (stqdm): The bar receiving the updates.
+    """
+
+    def __init__(self, progress_bar: "stqdm") -> None:
+        self.progress_bar = progress_bar
+        # deque.append and deque.popleft are atomic, no lock is needed between posters and the drainer
+        self._updates: deque[tuple[float, Optional[Mapping[str, Any] | str], Optional[str]]] = deque()
+
+    def post(self, n: float = 1, *, postfix: Optional[Mapping[str, Any] | str] = None, desc: Optional[str] = None) -> None:
+        """Posts an update. Safe to call from any thread.
+
+        Args:
+            n (float): Increment to add to the bar counter.
+            postfix (Optional[Mapping[str, Any] | str]): New postfix of the bar, the latest posted one wins.
+            desc (Optional[str]): New description of the bar, the latest posted one wins.
+        """
+        self._updates.append((n, postfix, desc))
+
+    def drain(self) -> bool:
+        """Applies all the posted updates to the bar with a single render. Call it from the thread owning the bar.
+
+        Returns:
+            bool: True if some updates were applied.
+        """
+        increment: float = 0
+        postfix: Optional[Mapping[str, Any] | str] = None
+        desc: Optional[str] = None
+        drained = False
+        while True:
+            try:
+                n, posted_postfix, posted_desc = self._updates.popleft()
+            except IndexError:
+                break
+            drained = True
+            increment += n
+            if posted_postfix is not None:
+                postfix = posted_postfix
+            if posted_desc is not None:
+                desc = posted_desc
+        if not drained:
+            return False
+
+        if desc is not None:
+            self.progress_bar.set_description(desc, refresh=False)
+        if isinstance(postfix, str):
+            self.progress_bar.set_postfix_str(postfix, refresh=False)
+        elif postfix is not None:
+            self.progress_bar.set_postfix(ordered_dict=postfix, refresh=False)
+        # update() renders by itself when tqdm's refresh conditions are met
+        if not (increment and self.progress_bar.update(increment)):
+            self.progress_bar.refresh()
+        return True
+
+    def drain_until(self, futures: Iterable[Future[Any]], poll_interval: float = 0.1) -> None:
+        """Drains posted updates every `poll_interval` seconds until all the futures are done.
+
+        Args:
+            futures (Iterable[Future]): The futures of the workers posting to this bus.
+            poll_interval (float): Time in seconds between two drains.
+        """
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=poll_interval)
+            self.drain()
+        self.drain()
+
+    def __enter__(self) -> "ProgressUpdateBus":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.drain()
+
+
+class ShardedCounter:
+    """A counter where each thread adds to its own slot, slots are only summed when the value is read.
+
+    Adding never takes a lock: each slot has a single writer, its thread.
+    This is used by stqdm(sharded_counter=True) to avoid contention when many threads call update().
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._slots: list[list[float]] = []
+        self._slots_lock = threading.Lock()
+        self._collected: float = 0
+
+    def add(self, n: float = 1) -> None:
+        """Adds n to the slot of the calling thread."""
+        try:
+            slot = self._local.slot
+        except AttributeError:
+            slot = self._register_slot()
+        slot[0] += n
+
+    def _register_slot(self) -> list[float]:
+        slot: list[float] = [0]
+        with self._slots_lock:
+            self._slots.append(slot)
+        self._local.slot = slot
+        return slot
+
+    @property
+    def value(self) -> float:
+        """The sum of all slots."""
+        return sum(slot[0] for slot in self._slots)
+
+    def collect(self) -> float:
+        """Returns what was added since the previous call. Callers must not collect concurrently."""
+        value = self.value
+        delta = value - self._collected
+        self._collected = value
+        return delta
@@ -0,0 +1,10 @@
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture(name="mock_has_script_run_context")
+def fixture_mock_has_script_run_context():
+    """Behave as if the tests were running inside a Streamlit script, frontend is disabled otherwise."""
+    with patch("stqdm.stqdm.has_script_run_context", return_value=True) as has_script_run_context:
+        yield has_script_run_context
@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from stqdm.concurrent import ScopedThreadPoolExecutor, process_map, propagate_scope
+from stqdm.stqdm import stqdm
+
+
+def _add(left: int, right: int) -> int:
+    return left + right
+
+
+def _fail_on_three(value: int) -> int:
+    if value == 3:
+        raise ValueError("three")
+    return value
+
+
+@pytest.mark.parametrize("chunksize", [1, 4, 100])
+def test_process_map_returns_results_in_order(chunksize: int):
+    assert process_map(_add, range(10), range(10), max_workers=2, chunksize=chunksize) == [2 * i for i in range(10)]
+
+
+def test_process_map_unordered_returns_all_results():
+    assert sorted(process_map(_add, range(10), range(10), max_workers=2, chunksize=3, ordered=False)) == [
+        2 * i for i in range(10)
+    ]
+
+
+def test_process_map_counts_every_item_on_a_single_bar():
+    with patch.object(stqdm, "close", autospec=True, side_effect=stqdm.close) as close_mock:
+        process_map(_add, range(7), range(7), max_workers=2, chunksize=3, poll_interval=0.01)
+
+    progress_bar = close_mock.call_args.args[0]
+    assert progress_bar.n == progress_bar.total == 7
+
+
+def test_process_map_propagates_worker_exceptions():
+    with pytest.raises(ValueError, match="three"):
+        process_map(_fail_on_three, range(5), max_workers=2)
+
+
+def test_process_map_rejects_invalid_chunksize():
+    with pytest.raises(ValueError, match="chunksize"):
+        process_map(_add, range(2), range(2), chunksize=0)
+
+
+def _current_desc() -> str:
+    return stqdm.combine_default_and_provided_kwargs({}).get("desc", "")
+
+
+def test_scoped_thread_pool_executor_propagates_the_submitting_scope():
+    with ScopedThreadPoolExecutor(max_workers=2) as executor:
+        with stqdm.scope(desc="submitted in scope"):
+            in_scope = executor.submit(_current_desc)
+            mapped = list(executor.map(lambda _: _current_desc(), range(3)))
+        out_of_scope = executor.submit(_current_desc)
+
+        assert in_scope.result() == "submitted in scope"
+        assert mapped == ["submitted in scope"] * 3
+        assert out_of_scope.result() == ""
+
+
+def test_thread_pool_executor_does_not_propagate_scopes():
+    with ThreadPoolExecutor(max_workers=1) as executor, stqdm.scope(desc="submitted in scope"):
+        assert executor.submit(_current_desc).result() == ""
+
+
+def test_propagate_scope_runs_the_callable_in_the_captured_scope():
+    with stqdm.scope(desc="captured"):
+        wrapped = propagate_scope(_current_desc)
+
+    assert wrapped.__name__ == "_current_desc"
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert [future.result() for future in [executor.submit(wrapped) for _ in range(4)]] == ["captured"] * 4
+
+
+def _current_script_run_ctx():
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def test_scoped_thread_pool_executor_attaches_the_script_run_context_only_while_the_task_runs():
+    script_run_ctx = MagicMock()
+    futures: list[Future] = []
+    with ScopedThreadPoolExecutor(max_workers=1) as executor:
+        submitter = threading.Thread(target=lambda: futures.append(executor.submit(_current_script_run_ctx)))
+        add_script_run_ctx(submitter, script_run_ctx)
+        submitter.start()
+        submitter.join()
+        assert futures[0].result() is script_run_ctx
+        # The same worker thread, submitted from a thread without context
+        assert executor.submit(_current_script_run_ctx).result() is None
@@ -1,10 +1,13 @@
 import asyncio
 import threading
 import time
+from contextlib import ExitStack
+from typing import Optional
+from unittest.mock import patch
 
 import pytest
 
-from stqdm.configuration_manager import ScopeManager
+from stqdm.configuration_manager import LayeredConfig, ScopeManager
 
 
 def test_scope_manager__get_default_config():
@@ -366,3 +369,165 @@ def test_scope_manager__child_thread_does_not_inherit_parent_active_scope():
         thread.join()
 
     assert result == {"shared": "default"}
+
+
+def test_scope_manager__set_default_config_invalidates_merges_cached_by_active_scopes():
+    scope_manager = ScopeManager({"foo": "default", "bar": "default"})
+
+    with scope_manager.scope({"foo": "outer"}):
+        with scope_manager.scope({"baz": "inner"}):
+            assert scope_manager.use_current_default_if_config_not_provided({}) == {
+                "foo": "outer",
+                "bar": "default",
+                "baz": "inner",
+            }
+            scope_manager.set_default_config({"bar": "new default"})
+
+            assert scope_manager.use_current_default_if_config_not_provided({}) == {
+                "foo": "outer",
+                "bar": "new default",
+                "baz": "inner",
+            }
+
+
+def test_scope_manager__returns_read_only_configs():
+    scope_manager = ScopeManager({"foo": "default"})
+
+    with scope_manager.scope({"bar": "scope"}) as scope_config:
+        merged_config = scope_manager.use_current_default_if_config_not_provided({"foo": "provided"})
+        for config in (merged_config, scope_config, scope_manager.get_current_scope_config()):
+            with pytest.raises(TypeError):
+                config["bar"] = "mutated"  # type: ignore[index]
+    with pytest.raises(TypeError):
+        scope_manager.get_default_config()["foo"] = "mutated"  # type: ignore[index]  # pylint: disable=unsupported-assignment-operation
+
+    assert scope_manager.use_current_default_if_config_not_provided({}) == {"foo": "default"}
+
+
+def test_layered_config_shares_the_layers_below_a_new_layer():
+    base = LayeredConfig(LayeredConfig.freeze({"foo": "bottom", "bar": "bottom"}))
+    layered = base.with_layer({"foo": "top"})
+
+    assert layered == {"foo": "top", "bar": "bottom"}
+    assert layered["bar"] == "bottom"
+    assert layered.layers[0] is base.layers[0]
+    assert base.with_layer({}) is base
+    with pytest.raises(KeyError):
+        layered["baz"]  # pylint: disable=pointless-statement
+
+
+def test_scope_manager__merges_of_a_scope_reuse_its_layered_config():
+    scope_manager = ScopeManager({"foo": "default"})
+
+    with scope_manager.scope({"bar": "scope"}):
+        first = scope_manager.use_current_default_if_config_not_provided({"desc": "first"})
+        with patch.object(LayeredConfig, "with_layer", side_effect=AssertionError("layered again")):
+            second = scope_manager.use_current_default_if_config_not_provided({"desc": "second"})
+
+    assert first == {"foo": "default", "bar": "scope", "desc": "first"}
+    assert second == {"foo": "default", "bar": "scope", "desc": "second"}
+
+
+def test_scope_manager__merge_does_not_grow_with_scope_depth():
+    scope_manager = ScopeManager({"foo": "default"})
+
+    with ExitStack() as stack:
+        for depth in range(100):
+            stack.enter_context(scope_manager.scope({f"level_{depth}": depth}))
+        scope_manager.use_current_default_if_config_not_provided({"desc": "first"})
+        # The flattened configuration of the innermost scope is built once, a merge only copies it
+        with patch.object(LayeredConfig, "with_layer", side_effect=AssertionError("layered again")):
+            merged = scope_manager.use_current_default_if_config_not_provided({"desc": "second"})
+
+    assert len(merged) == 102
+    assert merged["level_0"] == 0
+    assert merged["level_99"] == 99
+    assert merged.get("missing", "fallback") == "fallback"
+    assert "missing" not in merged
+
+
+class FakeSessions:
+    def __init__(self):
+        self.current: Optional[str] = None
+        self.active: set[str] = set()
+
+    def get_session_id(self) -> Optional[str]:
+        return self.current
+
+    def is_session_active(self, session_id: str) -> bool:
+        return session_id in self.active
+
+
+def test_scope_manager__session_default_config_overrides_global_default_in_its_session_only():
+    sessions = FakeSessions()
+    scope_manager = ScopeManager(
+        {"foo": "global", "bar": "global"},
+        get_session_id=sessions.get_session_id,
+        is_session_active=sessions.is_session_active,
+    )
+    sessions.active = {"a", "b"}
+    scope_manager.set_session_default_config({"foo": "session a"}, session_id="a")
+
+    sessions.current = "a"
+    assert scope_manager.use_current_default_if_config_not_provided({}) == {"foo": "session a", "bar": "global"}
+    with scope_manager.scope({"bar": "scope"}):
+        assert scope_manager.use_current_default_if_config_not_provided({}) == {"foo": "session a", "bar": "scope"}
+    sessions.current = "b"
+    assert scope_manager.use_current_default_if_config_not_provided({}) == {"foo": "global", "bar": "global"}
+    sessions.current = None
+    assert scope_manager.use_current_default_if_config_not_provided({}) == {"foo": "global", "bar": "global"}
+
+
+def test_scope_manager__session_default_config_follows_global_default_changes():
+    sessions = FakeSessions()
+    sessions.current = "a"
+    scope_manager = ScopeManager({"foo": "global"}, get_session_id=sessions.get_session_id)
+    scope_manager.set_session_default_config({"bar": "session"})
+
+    scope_manager.set_default_config({"foo": "new global"})
+
+    assert scope_manager.get_session_default_config() == {"foo": "new global", "bar": "session"}
+    scope_manager.clear_session_default_config()
+    assert scope_manager.get_session_default_config() == {"foo": "new global"}
+
+
+def test_scope_manager__session_default_config_cleared_while_read_is_not_restored():
+    sessions = FakeSessions()
+    sessions.current = "a"
+    scope_manager = ScopeManager({"foo": "global"}, get_session_id=sessions.get_session_id)
+    scope_manager.set_session_default_config({"bar": "session"})
+    scope_manager.set_default_config({"foo": "new global"})
+    with_layer = LayeredConfig.with_layer
+
+    def clear_while_merging(self, layer):
+        # Another thread clears the session default while this one layers it on the new global default
+        scope_manager.clear_session_default_config()
+        return with_layer(self, layer)
+
+    with patch.object(LayeredConfig, "with_layer", clear_while_merging):
+        assert scope_manager.get_session_default_config() == {"foo": "new global", "bar": "session"}
+    assert scope_manager.get_session_default_config() == {"foo": "new global"}
+
+
+def test_scope_manager__ended_sessions_are_evicted():
+    sessions = FakeSessions()
+    scope_manager = ScopeManager({}, get_session_id=sessions.get_session_id, is_session_active=sessions.is_session_active)
+    sessions.active = {"a", "b"}
+    scope_manager.set_session_default_config({"foo": "a"}, session_id="a")
+
+    sessions.active = {"b"}
+    scope_manager.set_session_default_config({"foo": "b"}, session_id="b")
+
+    assert scope_manager.get_session_default_config("a") == {}
+    assert scope_manager.get_session_default_config("b") == {"foo": "b"}
+
+    sessions.active = {"c"}
+    scope_manager.clear_session_default_config(session_id="c")
+    assert scope_manager.get_session_default_config("b") == {}
+
+
+def test_scope_manager__session_default_config_requires_a_session():
+    scope_manager = ScopeManager({}, get_session_id=lambda: None)
+
+    with pytest.raises(RuntimeError):
+        scope_manager.set_session_default_config({"foo": "bar"})
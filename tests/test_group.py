@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from stqdm.group import stqdm_group
+from stqdm.stqdm import stqdm
+
+pytestmark = pytest.mark.usefixtures("mock_has_script_run_context")
+
+TQDM_RUN_EVERY_ITERATION = {
+    "mininterval": 0,
+    "miniters": 0,
+}
+
+
+@pytest.fixture(name="st_container")
+def fixture_st_container():
+    return MagicMock()
+
+
+def rendered_tables(st_container: MagicMock) -> list[dict]:
+    return [call.args[0] for call in st_container.empty.return_value.dataframe.call_args_list]
+
+
+def test_group_renders_all_bars_in_a_single_element(st_container: MagicMock):
+    with patch("streamlit.container") as st_container_factory:
+        with stqdm_group(st_container=st_container, frontend_mininterval=0) as group:
+            first = group.bar(total=4, desc="first", **TQDM_RUN_EVERY_ITERATION)
+            second = group.bar(total=2, desc="second", **TQDM_RUN_EVERY_ITERATION)
+            first.update(2)
+            second.update(2)
+            first.close()
+            second.close()
+
+    st_container_factory.assert_not_called()
+    st_container.empty.assert_called_once()
+    last_table = rendered_tables(st_container)[-1]
+    assert last_table["progress"] == [50, 100]
+    assert last_table["status"][0].startswith("first")
+    assert last_table["status"][1].startswith("second")
+
+
+def test_group_coalesces_updates_within_frontend_mininterval(st_container: MagicMock):
+    group = stqdm_group(st_container=st_container, frontend_mininterval=3600)
+    bars = [group.bar(total=10, **TQDM_RUN_EVERY_ITERATION) for _ in range(20)]
+    for progress_bar in bars:
+        for _ in range(10):
+            progress_bar.update()
+    assert len(rendered_tables(st_container)) == 1
+
+    for progress_bar in bars:
+        progress_bar.close()
+    tables = rendered_tables(st_container)
+    assert len(tables) == 2
+    assert tables[-1]["progress"] == [100] * 20
+
+
+def test_group_removes_the_rows_of_bars_closed_with_leave_false(st_container: MagicMock):
+    with stqdm_group(st_container=st_container, frontend_mininterval=0) as group:
+        kept = group.bar(total=1, desc="kept", **TQDM_RUN_EVERY_ITERATION)
+        removed = group.bar(total=1, desc="removed", leave=False, **TQDM_RUN_EVERY_ITERATION)
+        removed.update()
+        removed.close()
+        kept.update()
+        kept.close()
+
+    last_table = rendered_tables(st_container)[-1]
+    assert len(last_table["status"]) == 1
+    assert last_table["status"][0].startswith("kept")
+
+
+def test_bars_of_a_group_do_not_create_their_own_elements(st_container: MagicMock):
+    group = stqdm_group(st_container=st_container)
+    with patch.object(stqdm, "st_display") as st_display:
+        for _ in stqdm(range(3), frontend_group=group):
+            pass
+
+    st_display.assert_not_called()
+
+
+def test_group_renders_updates_from_threads_without_script_run_context(st_container: MagicMock):
+    def has_script_run_context() -> bool:
+        # Executor workers have no ScriptRunContext, Streamlit would drop their elements
+        return not threading.current_thread().name.startswith("ThreadPoolExecutor")
+
+    rendering_threads = set()
+    st_container.empty.return_value.dataframe.side_effect = lambda *_, **__: rendering_threads.add(
+        threading.current_thread().name
+    )
+    with patch("stqdm.stqdm.has_script_run_context", side_effect=has_script_run_context):
+        with stqdm_group(st_container=st_container, frontend_mininterval=0.01) as group:
+            bars = [group.bar(range(50), desc=f"job {index}", **TQDM_RUN_EVERY_ITERATION) for index in range(3)]
+            with ThreadPoolExecutor(3) as executor:
+                for progress_bar in bars:
+                    executor.submit(lambda progress_bar: [time.sleep(0.001) for _ in progress_bar], progress_bar)
+
+    assert not any(name.startswith("ThreadPoolExecutor") for name in rendering_threads)
+    assert rendered_tables(st_container)[-1]["progress"] == [100] * 3
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import stqdm",
+        "from stqdm.configuration_manager import ScopeManager",
+        "from stqdm.types import STQDMArgs",
+        "from stqdm import stqdm; list(stqdm(range(3), backend=True))",
+    ],
+)
+def test_headless_usage_does_not_import_streamlit(statement: str):
+    code = f"import sys\n{statement}\nassert 'streamlit' not in sys.modules, 'streamlit was imported'"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_text_inside_progress_constant_is_still_available():
+    from stqdm.stqdm import IS_TEXT_INSIDE_PROGRESS_AVAILABLE  # pylint: disable=import-outside-toplevel
+
+    assert IS_TEXT_INSIDE_PROGRESS_AVAILABLE is True
+
+
+def test_version_is_available():
+    import stqdm  # pylint: disable=import-outside-toplevel
+
+    assert isinstance(stqdm.__version__, str)
@@ -0,0 +1,103 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+import tqdm
+import tqdm.auto
+import tqdm.notebook
+import tqdm.std
+
+from stqdm.patch import patch_tqdm, patched_tqdm
+from stqdm.stqdm import stqdm
+
+ORIGINAL_TQDM_CLASSES = {module: module.tqdm for module in (tqdm, tqdm.std, tqdm.auto, tqdm.notebook)}
+
+
+def assert_tqdm_is_restored():
+    for module, original in ORIGINAL_TQDM_CLASSES.items():
+        assert module.tqdm is original
+
+
+def test_patch_tqdm_replaces_tqdm_and_restores_it():
+    with patch_tqdm(aggregate=False):
+        for module in ORIGINAL_TQDM_CLASSES:
+            assert module.tqdm is patched_tqdm
+        assert isinstance(tqdm.auto.trange(2), stqdm)
+    assert_tqdm_is_restored()
+
+
+def test_patch_tqdm_restores_tqdm_when_the_body_raises():
+    with pytest.raises(RuntimeError):
+        with patch_tqdm():
+            raise RuntimeError("failed")
+    assert_tqdm_is_restored()
+
+
+def test_patch_tqdm_is_reference_counted_across_threads():
+    entered = threading.Barrier(2)
+    release = threading.Event()
+
+    def patch_in_thread():
+        with patch_tqdm():
+            entered.wait()
+            release.wait()
+
+    thread = threading.Thread(target=patch_in_thread)
+    thread.start()
+    with patch_tqdm():
+        entered.wait()
+    # The thread still holds its patch
+    assert tqdm.auto.tqdm is patched_tqdm
+    release.set()
+    thread.join()
+    assert_tqdm_is_restored()
+
+
+def test_patched_tqdm_accepts_tqdm_positional_arguments():
+    with patch_tqdm():
+        progress_bar = tqdm.tqdm(range(3), "description", 3)
+    assert progress_bar.desc == "description"
+    assert progress_bar.total == 3
+    assert list(progress_bar) == [0, 1, 2]
+
+
+def test_patched_tqdm_keeps_terminal_output_outside_of_streamlit():
+    with patch_tqdm():
+        progress_bar = tqdm.tqdm(range(3))
+    assert progress_bar._backend  # pylint: disable=protected-access
+    progress_bar.close()
+
+
+def test_patch_tqdm_aggregates_bars_in_a_single_summary():
+    st_container = MagicMock()
+    with patch("stqdm.stqdm.has_script_run_context", return_value=True):
+        with patch_tqdm(st_container=st_container, frontend_mininterval=3600, desc="Downloading") as summary:
+            for _ in range(100):
+                for _ in tqdm.auto.tqdm(range(10), mininterval=0, miniters=0):
+                    pass
+
+    assert summary is not None
+    st_container.empty.assert_called_once()
+    summary_widget = st_container.empty.return_value
+    # The first render, and the final state when the context exits
+    assert summary_widget.progress.call_count == 2
+    summary_widget.progress.assert_called_with(1.0, text="Downloading: 0 running, 100 finished, 1000/1000")
+
+
+def test_threads_without_session_use_the_policy_of_the_only_patching_session():
+    sessions = {threading.main_thread(): "session"}
+
+    def create_bar_in_thread():
+        bars = []
+        thread = threading.Thread(target=lambda: bars.append(tqdm.auto.tqdm(total=1, leave=False)))
+        thread.start()
+        thread.join()
+        return bars[0]
+
+    with patch("stqdm.patch.get_script_session_id", side_effect=lambda: sessions.get(threading.current_thread())):
+        with patch_tqdm(aggregate=False, desc="Patched in session"):
+            assert create_bar_in_thread().desc == "Patched in session"
+            # With several patching sessions, the session of the thread is unknown
+            sessions[threading.current_thread()] = "other session"
+            with patch_tqdm(aggregate=False, desc="Patched in other session"):
+                assert create_bar_in_thread().desc == ""
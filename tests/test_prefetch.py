@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import cast
+
+import pytest
+
+from stqdm.prefetch import PrefetchIterator
+from stqdm.stqdm import stqdm
+
+
+def test_prefetch_iterator_yields_all_items_in_order():
+    assert list(PrefetchIterator(iter(range(100)), size=4)) == list(range(100))
+
+
+def test_prefetch_iterator_does_not_consume_the_source_before_the_first_next():
+    pulled = []
+
+    def source():
+        for value in range(3):
+            pulled.append(value)
+            yield value
+
+    prefetcher = PrefetchIterator(source(), size=2)
+    time.sleep(0.05)
+    assert not pulled
+    assert next(prefetcher) == 0
+    prefetcher.close()
+    prefetcher.join(timeout=5)
+
+
+def test_prefetch_iterator_reads_ahead_up_to_its_size():
+    pulled = []
+    blocked_on_full_buffer = threading.Event()
+
+    def source():
+        for value in range(100):
+            pulled.append(value)
+            if value == 4:
+                blocked_on_full_buffer.set()
+            yield value
+
+    prefetcher = PrefetchIterator(source(), size=3)
+    assert next(prefetcher) == 0
+    assert blocked_on_full_buffer.wait(timeout=5)
+    # The consumed item, the buffer and the item blocked on the full buffer
+    assert prefetcher.buffered == 3
+    prefetcher.close()
+    prefetcher.join(timeout=5)
+    assert len(pulled) == 5
+
+
+def test_prefetch_iterator_raises_source_errors_after_the_items_read_before():
+    def failing_source():
+        yield 0
+        raise RuntimeError("source failed")
+
+    prefetcher = PrefetchIterator(failing_source(), size=2)
+    assert next(prefetcher) == 0
+    with pytest.raises(RuntimeError, match="source failed"):
+        next(prefetcher)
+    with pytest.raises(StopIteration):
+        next(prefetcher)
+
+
+def test_prefetch_iterator_rejects_empty_buffers():
+    with pytest.raises(ValueError):
+        PrefetchIterator([], size=0)
+
+
+def test_stqdm_prefetch_overlaps_the_source_with_the_loop_body():
+    read_ahead = threading.Event()
+
+    def source():
+        yield 0
+        read_ahead.set()
+        yield 1
+
+    for value in stqdm(source(), prefetch=2):
+        if value == 0:
+            # Without prefetching, the source would only be read again after this body
+            assert read_ahead.wait(timeout=5)
+
+
+def test_stqdm_prefetch_keeps_the_total_of_sized_iterables():
+    progress_bar = stqdm(list(range(7)), prefetch=2)
+    assert progress_bar.total == 7
+    assert list(progress_bar) == list(range(7))
+
+
+def test_stqdm_prefetch_stops_the_thread_when_the_loop_breaks():
+    progress_bar = stqdm(iter(range(1_000)), prefetch=2)
+    for _ in progress_bar:
+        break
+    prefetcher = cast(PrefetchIterator, progress_bar._prefetcher)  # pylint: disable=protected-access
+    producer = next(thread for thread in threading.enumerate() if thread.name == "stqdm-prefetch")
+    prefetcher.join(timeout=5)
+    assert not producer.is_alive()
@@ -120,6 +120,116 @@ def test_column_demos_render_progress_bars(demo_function: Callable[..., None], e
     assert len(progress_bars) == expected_progress_bars
 
 
+def test_group_demo_renders_a_single_table():
+    app_test = AppTest.from_function(demo_apps.stqdm_group_of_bars, kwargs={"bars": 5, "iterations": 3, "task_duration": 0.0})
+    app_test.run(timeout=5)
+
+    assert not app_test.exception
+    assert not collect_block_elements(app_test.main, should_take=lambda element: element.type == "progress")
+    tables = collect_block_elements(app_test.main, should_take=lambda element: element.type == "dataframe")
+    assert len(tables) == 1
+    assert list(tables[0].value["progress"]) == [100] * 5
+
+
+GROUP_IN_EXECUTOR_SCRIPT = """
+from concurrent.futures import ThreadPoolExecutor
+
+from stqdm.group import stqdm_group
+
+with stqdm_group() as group, ThreadPoolExecutor(3) as executor:
+    for index in range(3):
+        executor.submit(list, group.bar(range(50), desc=f"job {index}", mininterval=0, miniters=0))
+"""
+
+
+def test_group_renders_bars_advanced_from_executor_threads():
+    app_test = AppTest.from_string(GROUP_IN_EXECUTOR_SCRIPT)
+    app_test.run(timeout=5)
+
+    assert not app_test.exception
+    tables = collect_block_elements(app_test.main, should_take=lambda element: element.type == "dataframe")
+    assert len(tables) == 1
+    assert list(tables[0].value["progress"]) == [100] * 3
+
+
+SCOPED_EXECUTOR_SCRIPT = """
+from stqdm import stqdm
+from stqdm.concurrent import ScopedThreadPoolExecutor
+
+def job(index):
+    return sum(stqdm(range(10), desc=f"job {index}", mininterval=0))
+
+with stqdm.scope(backend=False), ScopedThreadPoolExecutor(2) as executor:
+    results = list(executor.map(job, range(2)))
+"""
+
+
+def test_scoped_executor_workers_render_bars_in_the_frontend():
+    app_test = AppTest.from_string(SCOPED_EXECUTOR_SCRIPT)
+    app_test.run(timeout=5)
+
+    assert not app_test.exception
+    progress_bars = collect_block_elements(app_test.main, should_take=lambda element: element.type == "progress")
+    assert sorted(progress_bar.value for progress_bar in progress_bars) == [100, 100]
+
+
+SHARDED_COUNTER_IN_EXECUTOR_SCRIPT = """
+from concurrent.futures import ThreadPoolExecutor
+
+from stqdm import stqdm
+
+progress_bar = stqdm(total=8_000, sharded_counter=True, mininterval=0, frontend_mininterval=0.01)
+with ThreadPoolExecutor(8) as executor:
+    for _ in range(8):
+        executor.submit(lambda: [progress_bar.update(1) for _ in range(1_000)])
+progress_bar.close()
+"""
+
+
+def test_sharded_counter_updated_from_executor_threads_renders_in_the_frontend():
+    app_test = AppTest.from_string(SHARDED_COUNTER_IN_EXECUTOR_SCRIPT)
+    app_test.run(timeout=10)
+
+    assert not app_test.exception
+    progress_bars = collect_block_elements(app_test.main, should_take=lambda element: element.type == "progress")
+    assert len(progress_bars) == 1
+    assert progress_bars[0].value == 100
+    assert "8000/8000" in progress_bars[0].text
+
+
+def test_patch_tqdm_demo_renders_a_single_summary():
+    app_test = AppTest.from_function(demo_apps.stqdm_patch_tqdm, kwargs={"bars": 20, "iterations": 5, "task_duration": 0.0})
+    app_test.run(timeout=5)
+
+    assert not app_test.exception
+    progress_bars = collect_block_elements(app_test.main, should_take=lambda element: element.type == "progress")
+    assert len(progress_bars) == 1
+    assert progress_bars[0].text == "Third-party bars: 0 running, 20 finished, 100/100"
+
+
+PATCH_TQDM_IN_EXECUTOR_SCRIPT = """
+from concurrent.futures import ThreadPoolExecutor
+
+import tqdm.auto
+
+from stqdm.patch import patch_tqdm
+
+with patch_tqdm(desc="Workers"), ThreadPoolExecutor(4) as executor:
+    for _ in range(8):
+        executor.submit(lambda: list(tqdm.auto.tqdm(range(5))))
+"""
+
+
+def test_patch_tqdm_aggregates_bars_created_by_executor_threads():
+    app_test = AppTest.from_string(PATCH_TQDM_IN_EXECUTOR_SCRIPT)
+    app_test.run(timeout=5)
+
+    assert not app_test.exception
+    progress_bars = collect_block_elements(app_test.main, should_take=lambda element: element.type == "progress")
+    assert len(progress_bars) == 1
+    assert progress_bars[0].text == "Workers: 0 running, 8 finished, 40/40"
+
+
 @pytest.mark.parametrize(
     "bar_format,expected_kind,expected_text",
     [
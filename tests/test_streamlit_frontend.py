@@ -1,4 +1,8 @@
 import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from typing import Optional
 from unittest.mock import MagicMock, patch
@@ -11,7 +15,10 @@ from stqdm import astqdm
 from stqdm import tqdm as package_tqdm
 from stqdm.asyncio import stqdm_asyncio
 from stqdm.auto import tqdm as auto_tqdm
-from stqdm.stqdm import IS_TEXT_INSIDE_PROGRESS_AVAILABLE, stqdm
+from stqdm.stqdm import IS_TEXT_INSIDE_PROGRESS_AVAILABLE, STQDM_ONLY_ARGS, compile_frontend_bar_format, stqdm
+from stqdm.types import STQDMArgs
+
+pytestmark = pytest.mark.usefixtures("mock_has_script_run_context")
 
 TQDM_RUN_EVERY_ITERATION = {
     "mininterval": 0,
@@ -456,3 +463,438 @@ def test_stqdm_asyncio_gather_returns_results_in_input_order():
         assert asyncio.run(collect()) == [1, 2]
 
     st_display_mock.assert_called()
+
+
+def test_frontend_mininterval_coalesces_frontend_updates_and_renders_last_state():
+    with freeze_time("2020-01-01"), patch.object(stqdm, "st_display") as st_display_mock:
+        for _ in stqdm(range(5), frontend_mininterval=10, **TQDM_RUN_EVERY_ITERATION):
+            pass
+
+    assert st_display_mock.call_count == 2
+    assert st_display_mock.call_args.kwargs["n"] == 5
+
+
+@patch.object(stqdm, "st_display")
+@patch.object(tqdm, "display")
+def test_frontend_mininterval_does_not_throttle_backend(tqdm_display_mock, st_display_mock):
+    with freeze_time("2020-01-01"):
+        for _ in stqdm(range(5), backend=True, frontend_mininterval=10, **TQDM_RUN_EVERY_ITERATION):
+            pass
+
+    assert tqdm_display_mock.call_count > st_display_mock.call_count
+
+
+def test_frontend_mininterval_renders_again_once_interval_elapsed():
+    with freeze_time("2020-01-01") as frozen_time, patch.object(stqdm, "st_display") as st_display_mock:
+        for _ in stqdm(range(3), frontend_mininterval=1, **TQDM_RUN_EVERY_ITERATION):
+            frozen_time.tick(timedelta(seconds=2))
+
+    assert [call.kwargs["n"] for call in st_display_mock.call_args_list[:4]] == [0, 1, 2, 3]
+
+
+def test_st_display_skips_frames_without_visible_change():
+    stqdmed_iterator = stqdm(range(1000), bar_format="{bar}", **TQDM_RUN_EVERY_ITERATION)
+    for _ in stqdmed_iterator:
+        pass
+
+    # One call per visible percent, from 0% to 100%
+    assert stqdmed_iterator.st_progress_bar.progress.call_count == 101
+    stqdmed_iterator.st_progress_bar.progress.assert_called_with(1.0)
+
+
+def test_frontend_progress_step_is_configurable():
+    stqdmed_iterator = stqdm(range(1000), bar_format="{bar}", frontend_progress_step=0.001, **TQDM_RUN_EVERY_ITERATION)
+    for _ in stqdmed_iterator:
+        pass
+
+    assert stqdmed_iterator.st_progress_bar.progress.call_count == 1001
+
+
+def test_st_display_writes_unchanged_text_once():
+    stqdmed_iterator = stqdm(range(5), bar_format="{desc}", desc="hello", **TQDM_RUN_EVERY_ITERATION)
+    for _ in stqdmed_iterator:
+        pass
+
+    stqdmed_iterator.st_text.write.assert_called_once_with("hello")
+
+
+def test_thread_render_mode_renders_outside_of_the_iterating_thread():
+    rendered: list[tuple[int, float]] = []
+
+    def record_render(**kwargs):
+        rendered.append((threading.get_ident(), kwargs["n"]))
+
+    with patch.object(stqdm, "st_display", side_effect=record_render):
+        stqdmed_iterator = stqdm(
+            range(3), frontend_render_mode="thread", frontend_mininterval=0.01, **TQDM_RUN_EVERY_ITERATION
+        )
+        for _ in stqdmed_iterator:
+            time.sleep(0.05)
+
+    assert any(thread_id != threading.get_ident() for thread_id, _ in rendered[:-1])
+    assert all(thread_id != threading.get_ident() for thread_id, _ in rendered[:-1])
+    # The final frame is flushed by close()
+    assert rendered[-1] == (threading.get_ident(), 3)
+    assert not stqdmed_iterator._frontend_renderer.is_alive()  # pylint: disable=protected-access
+
+
+def test_unknown_frontend_render_mode_raises():
+    with pytest.raises(ValueError, match="frontend_render_mode"):
+        stqdm(range(2), frontend_render_mode="unknown")
+
+
+def test_compile_frontend_bar_format_is_cached():
+    assert compile_frontend_bar_format("{desc}{bar}", None) is compile_frontend_bar_format("{desc}{bar}", None)
+    assert compile_frontend_bar_format("{desc}{bar}", None).fields == frozenset({"desc"})
+
+
+@pytest.mark.parametrize(
+    "bar_format",
+    ["{desc}", "{desc}: {n}/{total} {unit}", "{desc}: {percentage:.0f}%", "{n_fmt}/{total_fmt}", "static {{text}}"],
+)
+@pytest.mark.parametrize("n,total,prefix", [(3, 10, "hello"), (3, 10, ""), (12, 10, "over"), (3, None, "unknown")])
+def test_frontend_bar_format_fast_path_matches_format_meter(bar_format, n, total, prefix):
+    fast_text = compile_frontend_bar_format(bar_format, None).format_text(n, total, prefix=prefix, unit="it")
+
+    assert fast_text is not None
+    assert fast_text == tqdm.format_meter(n=n, total=total, elapsed=1, bar_format=bar_format, prefix=prefix)
+
+
+@pytest.mark.parametrize("bar_format,kwargs", [(None, {}), ("{desc} {rate_fmt}", {}), ("{n_fmt}", {"unit_scale": True})])
+def test_frontend_bar_format_falls_back_to_format_meter(bar_format, kwargs):
+    assert compile_frontend_bar_format(bar_format, None).format_text(3, 10, prefix="desc", **kwargs) is None
+
+
+def test_headless_stqdm_does_not_create_streamlit_elements(mock_has_script_run_context, mock_st_container):
+    mock_has_script_run_context.return_value = False
+    with patch.object(stqdm, "st_display") as st_display_mock:
+        stqdmed_iterator = stqdm(range(2), **TQDM_RUN_EVERY_ITERATION)
+        assert list(stqdmed_iterator) == [0, 1]
+
+    mock_st_container.assert_not_called()
+    st_display_mock.assert_not_called()
+    assert stqdmed_iterator.n == 2
+
+
+def test_frontend_false_does_not_create_streamlit_elements(mock_st_container):
+    for _ in stqdm(range(2), frontend=False, **TQDM_RUN_EVERY_ITERATION):
+        pass
+
+    mock_st_container.assert_not_called()
+
+
+def test_headless_stqdm_keeps_backend(mock_has_script_run_context):
+    mock_has_script_run_context.return_value = False
+    with patch.object(tqdm, "display") as tqdm_display_mock:
+        for _ in stqdm(range(2), backend=True, **TQDM_RUN_EVERY_ITERATION):
+            pass
+
+    tqdm_display_mock.assert_called()
+
+
+def test_stqdm_asyncio_gather_respects_max_concurrency():
+    running = 0
+    max_running = 0
+
+    async def task(value: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return value
+
+    async def collect():
+        return await stqdm_asyncio.gather(*(task(value) for value in range(20)), max_concurrency=3)
+
+    assert asyncio.run(collect()) == list(range(20))
+    assert max_running == 3
+
+
+def test_stqdm_asyncio_gather_unordered_returns_results_in_completion_order():
+    async def collect():
+        async def delayed_result(value: int, delay: float) -> int:
+            await asyncio.sleep(delay)
+            return value
+
+        return await stqdm_asyncio.gather(delayed_result(1, 0.02), delayed_result(2, 0.01), ordered=False)
+
+    assert asyncio.run(collect()) == [2, 1]
+
+
+def test_stqdm_asyncio_as_completed_coalesces_frontend_updates():
+    async def collect():
+        async def result(value: int) -> int:
+            await asyncio.sleep(0)
+            return value
+
+        return [await future for future in stqdm_asyncio.as_completed([result(value) for value in range(50)], mininterval=0)]
+
+    with freeze_time("2020-01-01"), patch.object(stqdm_asyncio, "st_display") as st_display_mock:
+        assert sorted(asyncio.run(collect())) == list(range(50))
+
+    # Initial and final frames only, completions in between are coalesced
+    assert st_display_mock.call_count == 2
+
+
+def test_stqdm_asyncio_as_completed_rejects_invalid_max_concurrency():
+    with pytest.raises(ValueError, match="max_concurrency"):
+        next(stqdm_asyncio.as_completed([], max_concurrency=0))
+
+
+def test_loop_render_mode_coalesces_updates_until_the_task_yields():
+    async def consume():
+        async for _ in stqdm_asyncio(range(100), frontend_render_mode="loop", **TQDM_RUN_EVERY_ITERATION):
+            pass
+
+    with patch.object(stqdm_asyncio, "st_display") as st_display_mock:
+        asyncio.run(consume())
+
+    # The loop body never yields, the only frame is the final one flushed by close()
+    st_display_mock.assert_called_once()
+    assert st_display_mock.call_args.kwargs["n"] == 100
+
+
+def test_loop_render_mode_schedules_renders_after_frontend_mininterval():
+    async def consume():
+        async for _ in stqdm_asyncio(
+            range(10), frontend_render_mode="loop", frontend_mininterval=3600, **TQDM_RUN_EVERY_ITERATION
+        ):
+            await asyncio.sleep(0)
+
+    with patch.object(stqdm_asyncio, "st_display") as st_display_mock:
+        asyncio.run(consume())
+
+    # The render scheduled at construction runs at the first yield and shows the latest state
+    assert [call.kwargs["n"] for call in st_display_mock.call_args_list] == [1, 10]
+
+
+def test_aclose_flushes_the_final_state():
+    async def run():
+        async with stqdm_asyncio(total=3, frontend_render_mode="loop", frontend_mininterval=3600) as progress_bar:
+            await asyncio.sleep(0)
+            progress_bar.update(3)
+
+    with patch.object(stqdm_asyncio, "st_display") as st_display_mock:
+        asyncio.run(run())
+
+    assert st_display_mock.call_args.kwargs["n"] == 3
+
+
+def test_loop_render_mode_is_only_available_for_stqdm_asyncio():
+    with pytest.raises(ValueError, match="frontend_render_mode"):
+        stqdm(range(2), frontend_render_mode="loop")
+
+
+def test_stqdm_asyncio_readahead_keeps_the_event_loop_responsive():
+    def blocking_source():
+        for value in range(3):
+            time.sleep(0.05)
+            yield value
+
+    async def consume():
+        ticks = 0
+        consumed = []
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker_task = asyncio.ensure_future(ticker())
+        async for item in stqdm_asyncio(blocking_source(), readahead=2):
+            consumed.append(item)
+        ticker_task.cancel()
+        return consumed, ticks
+
+    consumed, ticks = asyncio.run(consume())
+    assert consumed == [0, 1, 2]
+    assert ticks > 10
+
+
+def test_stqdm_asyncio_readahead_is_bounded():
+    pulled = []
+
+    def source():
+        for value in range(100):
+            pulled.append(value)
+            yield value
+
+    async def consume_first():
+        async for item in stqdm_asyncio(source(), readahead=3):
+            await asyncio.sleep(0.05)
+            return item
+        return None
+
+    assert asyncio.run(consume_first()) == 0
+    # The item being consumed, the queue and the item blocked on the full queue
+    assert len(pulled) <= 5
+
+
+def test_stqdm_asyncio_readahead_propagates_source_errors():
+    def failing_source():
+        yield 0
+        raise RuntimeError("source failed")
+
+    async def consume():
+        return [item async for item in stqdm_asyncio(failing_source(), executor=ThreadPoolExecutor(1))]
+
+    with pytest.raises(RuntimeError, match="source failed"):
+        asyncio.run(consume())
+
+
+def test_show_prefetch_displays_the_buffer_fill_level_in_the_frontend():
+    with patch.object(stqdm, "st_display") as st_display:
+        progress_bar = stqdm(range(3), prefetch=2, show_prefetch=True, postfix="rows", **TQDM_RUN_EVERY_ITERATION)
+        list(progress_bar)
+
+    assert st_display.call_args.kwargs["postfix"].startswith("rows, prefetch=")
+    assert st_display.call_args.kwargs["postfix"].endswith("/2")
+
+
+def test_stqdm_asyncio_batch_size_updates_once_per_batch():
+    async def consume(progress_bar: stqdm_asyncio):
+        seen = []
+        async for item in progress_bar:
+            seen.append((item, progress_bar.n))
+        return seen
+
+    progress_bar = stqdm_asyncio(AsyncRange(5), batch_size=2, **TQDM_RUN_EVERY_ITERATION)
+    with patch.object(stqdm_asyncio, "update", wraps=progress_bar.update) as update:
+        seen = asyncio.run(consume(progress_bar))
+
+    assert seen == [(0, 0), (1, 0), (2, 2), (3, 2), (4, 4)]
+    assert [call.args[0] for call in update.call_args_list] == [2, 2, 1]
+    assert progress_bar.n == 5
+
+
+def test_stqdm_asyncio_batch_size_counts_consumed_items_when_the_loop_breaks():
+    async def consume_three(progress_bar: stqdm_asyncio):
+        async for item in progress_bar:
+            if item == 2:
+                break
+        await progress_bar.aclose()
+
+    progress_bar = stqdm_asyncio(AsyncRange(10), batch_size=4)
+    asyncio.run(consume_three(progress_bar))
+
+    assert progress_bar.n == 3
+
+
+def test_stqdm_asyncio_batch_size_fetches_pages_with_fetchmany():
+    class AsyncCursor(AsyncRange):
+        def __init__(self, total: int):
+            super().__init__(total)
+            self.fetchmany_sizes = []
+
+        async def fetchmany(self, size: int):
+            self.fetchmany_sizes.append(size)
+            rows = list(range(self.index, min(self.index + size, self.total)))
+            self.index += len(rows)
+            return rows
+
+    async def consume(progress_bar: stqdm_asyncio):
+        return [item async for item in progress_bar]
+
+    cursor = AsyncCursor(7)
+    progress_bar = stqdm_asyncio(cursor, batch_size=3)
+
+    assert asyncio.run(consume(progress_bar)) == list(range(7))
+    assert cursor.fetchmany_sizes == [3, 3, 3, 3]
+    assert progress_bar.n == 7
+
+
+def test_reset_reopens_a_closed_bar_in_the_same_placeholders(mock_st_container):
+    # pylint: disable=protected-access
+    outer_placeholders = set()
+    inner_bar = stqdm(leave=False, **TQDM_RUN_EVERY_ITERATION)
+    for batch in (range(2), range(3), range(4)):
+        inner_bar.reset(iterable=batch)
+        assert inner_bar.total == len(batch)
+        assert list(inner_bar) == list(batch)
+        assert inner_bar._st_progress_bar is None
+        outer_placeholders.add(id(inner_bar._cleared_st_progress_bar))
+
+    assert len(outer_placeholders) == 1
+    # The text of the initial bar without total, and the progress bar
+    assert mock_st_container.return_value.empty.call_count == 2
+    assert inner_bar not in stqdm._instances
+
+
+def test_reset_of_an_open_bar_only_resets_the_counter():
+    progress_bar = stqdm(total=5, **TQDM_RUN_EVERY_ITERATION)
+    progress_bar.update(5)
+    progress_bar.reset(total=3)
+
+    assert progress_bar.n == 0
+    assert progress_bar.total == 3
+    assert not progress_bar.disable
+    progress_bar.close()
+
+
+def test_reset_does_not_enable_a_disabled_bar():
+    progress_bar = stqdm(range(3), disable=True)
+    progress_bar.reset(iterable=range(2))
+
+    assert progress_bar.disable
+    assert list(progress_bar) == [0, 1]
+
+
+def test_stqdm_asyncio_reset_accepts_async_iterables():
+    async def consume(progress_bar: stqdm_asyncio):
+        return [item async for item in progress_bar]
+
+    progress_bar = stqdm_asyncio(AsyncRange(2), leave=False)
+    assert asyncio.run(consume(progress_bar)) == [0, 1]
+    progress_bar.reset(iterable=AsyncRange(3), total=3)
+    assert asyncio.run(consume(progress_bar)) == [0, 1, 2]
+    assert progress_bar.n == 3
+    progress_bar.reset(iterable=range(4))
+    assert asyncio.run(consume(progress_bar)) == [0, 1, 2, 3]
+    assert progress_bar.total == 4
+
+
+def test_frontend_delay_skips_bars_finishing_before_the_threshold(mock_st_container):
+    with freeze_time("2020-01-01"), patch.object(stqdm, "st_display") as st_display_mock:
+        for _ in stqdm(range(3), frontend_delay=1, **TQDM_RUN_EVERY_ITERATION):
+            pass
+
+    st_display_mock.assert_not_called()
+    mock_st_container.assert_not_called()
+
+
+def test_frontend_delay_renders_the_current_state_once_the_threshold_is_crossed():
+    with freeze_time("2020-01-01") as frozen_time, patch.object(stqdm, "st_display") as st_display_mock:
+        for index in stqdm(range(5), frontend_delay=1, **TQDM_RUN_EVERY_ITERATION):
+            if index == 2:
+                frozen_time.tick(timedelta(seconds=2))
+
+    assert [call.kwargs["n"] for call in st_display_mock.call_args_list[:3]] == [3, 4, 5]
+
+
+def test_stqdm_only_args_are_the_stqdm_args_unknown_to_tqdm():
+    tqdm_parameters = set(inspect.signature(tqdm.__init__).parameters)
+    assert STQDM_ONLY_ARGS == set(STQDMArgs.__annotations__) - tqdm_parameters
+
+
+def test_stqdm_does_not_mutate_the_scope_config():
+    with stqdm.scope(frontend=False, desc="scoped") as scope_config:
+        for _ in stqdm(range(2)):
+            pass
+        assert dict(scope_config) == {"frontend": False, "desc": "scoped"}
+
+
+def test_stqdm_session_default_config_applies_to_the_bars_of_the_session():
+    with patch.object(stqdm.scope_stack, "_get_session_id", return_value="session"):
+        stqdm.set_session_default_config(desc="session default")
+        try:
+            assert stqdm(range(2)).desc == "session default"
+        finally:
+            stqdm.clear_session_default_config()
+        assert stqdm(range(2)).desc == ""
+
+
+def test_stqdm_session_default_config_requires_a_streamlit_session():
+    with pytest.raises(RuntimeError):
+        stqdm.set_session_default_config(desc="session default")
@@ -0,0 +1,184 @@
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import cast
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from stqdm.asyncio import stqdm_asyncio
+from stqdm.stqdm import stqdm
+from stqdm.telemetry import PROGRESS_PAYLOAD_BYTES, LatencyHistogram, RenderStats, global_render_stats
+
+pytestmark = pytest.mark.usefixtures("mock_has_script_run_context")
+
+
+@pytest.fixture(autouse=True)
+def reset_global_render_stats():
+    global_render_stats.reset()
+    yield
+    global_render_stats.reset()
+
+
+def test_record_propagates_to_the_parent():
+    parent = RenderStats()
+    child = RenderStats(parent=parent)
+    child.record(st_display_calls=2, deltas=3, payload_bytes=10, frontend_time=0.5)
+
+    assert child.as_dict() == parent.as_dict()
+    assert parent.st_display_calls == 2
+    assert parent.deltas == 3
+    assert parent.payload_bytes == 10
+    assert parent.frontend_time == 0.5
+
+
+def test_loop_time_is_the_elapsed_time_not_spent_rendering():
+    stats = RenderStats()
+    stats.record(elapsed=3.0, frontend_time=1.0, backend_time=0.5, bars=1)
+    assert stats.loop_time == 1.5
+    stats.reset()
+    assert stats.as_dict() == {key: 0 for key in stats.as_dict()}
+
+
+def test_global_counters_are_thread_safe():
+    with ThreadPoolExecutor(8) as executor:
+        for _ in range(8):
+            executor.submit(lambda: [RenderStats(parent=global_render_stats).record(deltas=1) for _ in range(1000)])
+    assert global_render_stats.deltas == 8000
+
+
+def test_bar_counters_are_locked_when_recorded_from_many_threads():
+    assert stqdm(total=1, st_container=MagicMock(), backend=False).render_stats._lock is None  # pylint: disable=protected-access
+    for config in ({"frontend_render_mode": "thread"}, {"sharded_counter": True}):
+        progress_bar = stqdm(total=1, st_container=MagicMock(), backend=False, **config)
+        assert progress_bar.render_stats._lock is not None  # pylint: disable=protected-access
+        progress_bar.close()
+
+
+def test_bar_counts_calls_deltas_and_payload():
+    st_container = MagicMock()
+    progress_bar = stqdm(total=2, st_container=st_container, backend=False, bar_format="{n}/{total}")
+    progress_bar.update(1)
+    progress_bar.refresh()  # Same frame, skipped
+    progress_bar.close()
+
+    stats = progress_bar.render_stats
+    assert stats.st_display_calls >= 3
+    assert stats.bars == 1
+    assert stats.elapsed >= stats.frontend_time > 0
+    assert stats.backend_time == 0
+    assert global_render_stats.as_dict() == stats.as_dict()
+
+    # The text placeholder, then "0/2" and "1/2": without {bar} in bar_format, there is no progress element
+    assert st_container.mock_calls == [call.empty(), call.empty().write("0/2"), call.empty().write("1/2")]
+    assert stats.deltas == 3
+    assert stats.payload_bytes == len("0/2") + len("1/2")
+
+
+def test_progress_value_is_counted_in_the_payload():
+    progress_bar = stqdm(total=2, st_container=MagicMock(), backend=False, bar_format="{bar}")
+    progress_bar.close()
+    assert progress_bar.render_stats.payload_bytes == PROGRESS_PAYLOAD_BYTES
+
+
+def test_backend_time_is_recorded(capsys):
+    for _ in stqdm(range(3), st_container=MagicMock(), backend=True):
+        pass
+    capsys.readouterr()
+    assert global_render_stats.backend_time > 0
+    assert global_render_stats.bars == 1
+
+
+def test_stats_returns_the_global_counters():
+    assert stqdm.stats() is global_render_stats
+
+
+def test_latency_histogram_percentiles_are_within_a_bucket():
+    histogram = LatencyHistogram()
+    for millisecond in range(1, 1001):
+        histogram.record(millisecond / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.min == 0.001
+    assert histogram.max == 1.0
+    assert histogram.mean == pytest.approx(0.5005)
+    for percent in (50, 95, 99):
+        exact = percent / 100
+        # Buckets grow by 2 ** (1 / 8), about 9%
+        assert exact <= histogram.percentile(percent) <= exact * 2 ** (1 / 8)
+    assert histogram.percentile(100) == 1.0
+
+
+def test_latency_histogram_has_a_fixed_size():
+    histogram = LatencyHistogram()
+    buckets = len(histogram._counts)  # pylint: disable=protected-access
+    for duration in (0, 1e-9, 1e-3, 1e9):
+        histogram.record(duration)
+    assert len(histogram._counts) == buckets  # pylint: disable=protected-access
+    assert histogram.percentile(50) <= 1e-6 * 2 ** (1 / 8)
+    # Durations past the last bucket are reported by their exact max
+    assert histogram.percentile(95) == 1e9
+    histogram.reset()
+    assert histogram.summary() == {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+
+def test_record_latency_times_the_loop_body():
+    progress_bar = stqdm(range(20), record_latency=True, st_container=MagicMock(), backend=False)
+    for index in progress_bar:
+        if index == 10:
+            time.sleep(0.05)
+
+    latency = cast(LatencyHistogram, progress_bar.latency)
+    assert latency.count == 20
+    assert latency.percentile(50) < 0.01
+    assert latency.max >= 0.05
+    assert latency.percentile(99) >= 0.05
+
+
+def test_record_latency_with_sharded_counter():
+    progress_bar = stqdm(range(5), record_latency=True, sharded_counter=True, st_container=MagicMock(), backend=False)
+    assert list(progress_bar) == list(range(5))
+    assert progress_bar.n == 5
+    assert cast(LatencyHistogram, progress_bar.latency).count == 5
+
+
+def test_latency_is_not_recorded_by_default():
+    progress_bar = stqdm(range(3), st_container=MagicMock(), backend=False)
+    list(progress_bar)
+    assert progress_bar.latency is None
+
+
+def test_show_latency_displays_percentiles_in_the_frontend():
+    st_container = MagicMock()
+    for _ in stqdm(range(3), show_latency=True, st_container=st_container, backend=False, bar_format="{n}{postfix}"):
+        pass
+
+    last_text = st_container.empty().write.call_args.args[0]
+    assert re.fullmatch(r"3, p50=\d+µs, p95=\d+µs, p99=\d+µs, max=\d+µs", last_text)
+
+
+def test_reset_clears_the_latency():
+    progress_bar = stqdm(range(3), record_latency=True, st_container=MagicMock(), backend=False)
+    list(progress_bar)
+    progress_bar.reset(iterable=range(2))
+    list(progress_bar)
+    assert cast(LatencyHistogram, progress_bar.latency).count == 2
+
+
+def test_record_latency_times_the_body_of_async_for_loops():
+    async def iterate(progress_bar: stqdm_asyncio) -> None:
+        async for index in progress_bar:
+            if index == 5:
+                await asyncio.sleep(0.05)
+
+    for batch_size in (None, 3):
+        progress_bar = stqdm_asyncio(
+            range(10), record_latency=True, batch_size=batch_size, st_container=MagicMock(), backend=False
+        )
+        asyncio.run(iterate(progress_bar))
+
+        latency = cast(LatencyHistogram, progress_bar.latency)
+        assert latency.count == 10
+        assert latency.percentile(50) < 0.01
+        assert latency.max >= 0.05
@@ -0,0 +1,138 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from stqdm.stqdm import stqdm
+from stqdm.trace import TraceRecorder, get_active_recorder
+
+
+def load_events(path):
+    with open(path, encoding="utf-8") as trace_file:
+        return json.load(trace_file)["traceEvents"]
+
+
+def spans(events):
+    return [event for event in events if event["ph"] == "X"]
+
+
+def test_bars_outside_of_a_recorder_are_not_traced(tmp_path):
+    recorder = TraceRecorder(tmp_path / "trace.json")
+    list(stqdm(range(3), backend=False))
+    assert get_active_recorder() is None
+    assert not recorder.events
+
+
+def test_nested_bars_are_recorded_as_nested_spans(tmp_path):
+    path = tmp_path / "trace.json"
+    with TraceRecorder(path) as recorder:
+        assert get_active_recorder() is recorder
+        for _ in stqdm(range(2), desc="outer", backend=False):
+            for _ in stqdm(range(3), desc="inner", backend=False, leave=False):
+                pass
+    assert get_active_recorder() is None
+
+    events = load_events(path)
+    outer, *_ = [span for span in spans(events) if span["name"] == "outer"]
+    inners = [span for span in spans(events) if span["name"] == "inner"]
+    assert len(inners) == 2
+    for inner in inners:
+        assert inner["tid"] == outer["tid"]
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert inner["args"]["n"] == 3
+        assert inner["args"]["position"] == 1
+    assert outer["args"]["position"] == 0
+    thread_name = {"name": "thread_name", "ph": "M", "pid": outer["pid"], "tid": outer["tid"], "args": {"name": "MainThread"}}
+    assert thread_name in events
+
+
+def test_frontend_updates_are_sampled_with_a_first_render(tmp_path):
+    with patch("stqdm.stqdm.has_script_run_context", return_value=True), TraceRecorder(tmp_path / "trace.json") as recorder:
+        progress_bar = stqdm(total=3, desc="job", st_container=MagicMock(), backend=False, mininterval=60)
+        progress_bar.update(1)
+        progress_bar.refresh()
+        progress_bar.update(2)
+        progress_bar.close()
+
+    events = recorder.events
+    first_renders = [event for event in events if event["ph"] == "i"]
+    assert [event["name"] for event in first_renders] == ["first render"]
+    samples = [event["args"]["n"] for event in events if event["ph"] == "C"]
+    assert samples == [0, 1, 3]
+    assert spans(events)[0]["name"] == "job"
+
+
+def test_open_bars_are_written_as_spans_ending_at_the_flush(tmp_path):
+    path = tmp_path / "trace.json"
+    recorder = TraceRecorder(path).start()
+    progress_bar = stqdm(total=2, desc="running", backend=False)
+    recorder.stop()
+
+    (span,) = spans(load_events(path))
+    assert span["name"] == "running"
+    assert span["args"]["closed"] is False
+    progress_bar.close()
+
+
+def test_ring_buffer_keeps_the_latest_events(tmp_path):
+    with TraceRecorder(tmp_path / "trace.json", max_events=4) as recorder:
+        for index in range(5):
+            stqdm(total=1, desc=f"bar {index}", backend=False).close()
+
+    # Each bar records a sample of its counter when created and when closed, then its span
+    events = [event for event in recorder.events if event["ph"] != "M"]
+    assert [(event["ph"], event["name"]) for event in events] == [
+        ("X", "bar 3"),
+        ("C", "bar 4"),
+        ("C", "bar 4"),
+        ("X", "bar 4"),
+    ]
+    assert recorder.dropped_events == 11
+    with pytest.raises(ValueError):
+        TraceRecorder(tmp_path / "trace.json", max_events=0)
+
+
+def test_asyncio_tasks_have_their_own_track(tmp_path):
+    async def task():
+        for _ in stqdm(range(2), backend=False):
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(task(), task())
+
+    with TraceRecorder(tmp_path / "trace.json") as recorder:
+        asyncio.run(main())
+
+    events = recorder.events
+    task_spans = spans(events)
+    assert len({span["tid"] for span in task_spans}) == 2
+    track_names = [event["args"]["name"] for event in events if event["ph"] == "M"]
+    assert all(name.startswith("asyncio task") for name in track_names)
+
+
+def test_recorders_can_be_nested(tmp_path):
+    with TraceRecorder(tmp_path / "outer.json") as outer:
+        with TraceRecorder(tmp_path / "inner.json"):
+            stqdm(total=1, backend=False).close()
+        assert get_active_recorder() is outer
+    assert not spans(outer.events)
+
+
+def test_track_names_are_dropped_with_their_last_event(tmp_path):
+    async def task():
+        stqdm(total=1, backend=False).close()
+
+    async def main():
+        for index in range(100):
+            await asyncio.create_task(task(), name=f"job {index}")
+
+    with TraceRecorder(tmp_path / "trace.json", max_events=6) as recorder:
+        asyncio.run(main())
+
+    events = recorder.events
+    track_names = {event["tid"]: event["args"]["name"] for event in events if event["ph"] == "M"}
+    # Two bars, of three events each, fit in the buffer: only their tracks are named
+    assert sorted(track_names.values()) == ["asyncio task job 98", "asyncio task job 99"]
+    assert {event["tid"] for event in events if event["ph"] != "M"} == set(track_names)
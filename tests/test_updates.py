@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from stqdm.stqdm import stqdm
+from stqdm.updates import ProgressUpdateBus, ShardedCounter
+
+TQDM_RUN_EVERY_ITERATION = {
+    "mininterval": 0,
+    "miniters": 0,
+}
+
+
+def test_progress_update_bus_applies_posts_from_many_threads():
+    def work(bus: ProgressUpdateBus) -> None:
+        for _ in range(1_000):
+            bus.post()
+
+    with stqdm(total=32_000) as progress_bar, ThreadPoolExecutor(32) as executor:
+        bus = ProgressUpdateBus(progress_bar)
+        bus.drain_until([executor.submit(work, bus) for _ in range(32)], poll_interval=0.01)
+
+        assert progress_bar.n == 32_000
+
+
+def test_progress_update_bus_renders_once_per_drain():
+    with stqdm(total=10, **TQDM_RUN_EVERY_ITERATION) as progress_bar:
+        bus = ProgressUpdateBus(progress_bar)
+        for _ in range(10):
+            bus.post()
+        with patch.object(stqdm, "display") as display_mock:
+            assert bus.drain()
+            assert not bus.drain()
+
+    display_mock.assert_called_once()
+    assert progress_bar.n == 10
+
+
+def test_progress_update_bus_keeps_latest_postfix_and_description():
+    with stqdm(total=3) as progress_bar:
+        with ProgressUpdateBus(progress_bar) as bus:
+            bus.post(postfix={"loss": 1}, desc="first")
+            bus.post(postfix={"loss": 0.5})
+            bus.post(0, desc="second")
+
+        assert progress_bar.n == 2
+        assert progress_bar.postfix == "loss=0.5"
+        assert progress_bar.desc == "second: "
+
+
+def test_sharded_counter_sums_slots_of_all_threads():
+    counter = ShardedCounter()
+
+    def work() -> None:
+        for _ in range(1_000):
+            counter.add()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value == 8_000
+    assert counter.collect() == 8_000
+    assert counter.collect() == 0
+
+
+def test_sharded_stqdm_merges_updates_lazily():
+    progress_bar = stqdm(total=8_000, sharded_counter=True, mininterval=3600)
+
+    def work() -> None:
+        for _ in range(1_000):
+            progress_bar.update(1)
+
+    with ThreadPoolExecutor(8) as executor:
+        for _ in range(8):
+            executor.submit(work)
+
+    # Nothing was merged yet, mininterval is not elapsed
+    assert progress_bar.n == 0
+    progress_bar.close()
+    assert progress_bar.n == 8_000
+
+
+def test_sharded_stqdm_iteration_counts_every_item():
+    progress_bar = stqdm(range(100), sharded_counter=True, **TQDM_RUN_EVERY_ITERATION)
+
+    assert list(progress_bar) == list(range(100))
+    assert progress_bar.n == 100
+
+
+def test_disabled_sharded_stqdm_does_not_count():
+    progress_bar = stqdm(range(3), sharded_counter=True, disable=True)
+    assert list(progress_bar) == [0, 1, 2]
+    assert progress_bar.update(1) is None
+    assert progress_bar.n == 0